@@ -175,8 +175,9 @@ def main():
     run_script("tts.py", [], interactive=args.interactive_all)
     check_pos_tts()
 
-    # 6) word-level timestamps
-    run_script("generate_all_word_timestamps.py", [], interactive=args.interactive_all)
+    # 6) word-level timestamps (um único processo: Whisper carregado uma vez para todas as falas)
+    # --force: as falas acabaram de ser regeradas pelo tts.py (com --no-backup os *_words.json antigos continuam em output/)
+    run_script("generate_word_timestamps.py", ["--force"], interactive=args.interactive_all)
     check_pos_wordstamps()
 
     # 7) subtitles
@@ -18,7 +18,8 @@ Focused Context Fetcher — Flow Games Only (últimos 2 dias)
 """
 
 from __future__ import annotations
-import re, json, html
+import re, json, html, hashlib, os, string, threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Any, Optional, Tuple
@@ -26,7 +27,9 @@ from urllib.parse import urlparse
 
 import feedparser
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Paths / Constantes
@@ -37,8 +40,12 @@ CHOICE_PATH  = OUT_DIR / "noticia_escolhida.json"
 CTX_PATH     = OUT_DIR / "contexto_expandido.txt"
 ITENS_PATH   = OUT_DIR / "itens_detectados.json"
 TOPLIST_PATH = OUT_DIR / "top_list.json"
+HTTP_CACHE_DIR = Path("assets/.http_cache")  # HTML por URL (+ ETag/Last-Modified) entre execuções; fora de output/ (backup do pipeline)
+HTTP_CACHE_MAX_DAYS = 2                    # mesma janela do feed
 
 TIMEOUT = 18
+PREFETCH_TOP_K   = 6   # quantos artigos do topo já baixar/extrair enquanto o usuário escolhe
+PREFETCH_WORKERS = 6
 UA = "Mozilla/5.0 (Linux; Android 14) ZeroATechFocused/2.2 Mobile Safari"
 HDRS = {
     "User-Agent": UA,
@@ -48,25 +55,44 @@ HDRS = {
     "Pragma": "no-cache",
 }
 
+# Sessão única: mantém TCP/TLS vivos entre requisições (keep-alive + pool)
+_SESSION = requests.Session()
+_SESSION.headers.update(HDRS)
+_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Flow Games
 # ──────────────────────────────────────────────────────────────────────────────
 FLOW_FEED = "https://flowgames.gg/feed/"
 
-FLOW_SELECTORS = [
-    ".entry-content",
-    "article .entry-content",
-    ".post-content",
-    "article .post-content",
-    "article .single__content",
-    ".single__content",
-    ".content-area article",
-    "main article .content",
+# Cada seletor é uma cadeia de (tag, attrs) resolvida com .find() descendo na árvore
+# (equivale aos antigos CSS ".entry-content", ".content-area article", etc. sem passar pelo soupsieve)
+Selector = Tuple[Tuple[Optional[str], Dict[str, Any]], ...]
+FLOW_SELECTORS: List[Selector] = [
+    ((None, {"class": "entry-content"}),),
+    ((None, {"class": "post-content"}),),
+    ((None, {"class": "single__content"}),),
+    ((None, {"class": "content-area"}), ("article", {})),
+    (("main", {}), ("article", {}), (None, {"class": "content"})),
 ]
 
+# Parse parcial: materializa só a subárvore do artigo (pula nav/comentários/relacionados)
+FLOW_STRAINER = SoupStrainer(attrs={"class": re.compile(r"(entry-content|post-content|single__content|content-area)")})
+
+# <script type="application/ld+json"> — fonte estruturada do corpo (articleBody)
+LD_JSON_STRAINER = SoupStrainer("script", attrs={"type": "application/ld+json"})
+BODY_MAX_CHARS = 24000
+
 ADAPTERS = {
     "flowgames.gg": {
         "containers": FLOW_SELECTORS,
+        "strainer": FLOW_STRAINER,
         "min_len": 220
     },
 }
@@ -79,6 +105,25 @@ RE_MONEY    = re.compile(r"(R\$\s?\d{1,3}(?:\.\d{3})*,\d{2})|\b(\d{1,3},\d{2}\s?
 RE_PERCENT  = re.compile(r"(\d{1,3})\s?%", re.I)
 RE_PLATFORM = re.compile(r"\b(steam|epic|gog|psn|playstation|xbox|nintendo|switch|prime gaming|ea play)\b", re.I)
 
+# ──────────────────────────────────────────────────────────────────────────────
+# Regex pré-compiladas (usadas nos loops de extração)
+# ──────────────────────────────────────────────────────────────────────────────
+_RE_KILL_CLASSES   = re.compile(r"(newsletter|related|promo|share|social|breadcrumbs|post-tags|advert|ads|sidebar)", re.I)
+_RE_RELATED_PARENT = re.compile(r"(related|more|promo|newsletter|share)", re.I)
+_RE_LEIA_MAIS      = re.compile(r"(leia mais|assine|newsletter|siga-nos|compartilhe)", re.I)
+# Promo em uma passada só: preço | % | plataforma (classificado via m.lastgroup)
+_RE_PROMO          = re.compile(rf"(?P<money>{RE_MONEY.pattern})|(?P<pct>{RE_PERCENT.pattern})|(?P<plat>{RE_PLATFORM.pattern})", re.I)
+_RE_PRICE          = re.compile(rf"{RE_MONEY.pattern}|{RE_PERCENT.pattern}", re.I)
+# Limpeza do candidato: colchetes/separadores + stopwords numa única sub
+_RE_STRIP          = re.compile(r"[(){}\[\]•\-–—:|]+|\b(?:agora|por|de|até|na|no|por apenas|cada|com|em)\b", re.I)
+_RE_WHITESPACE     = re.compile(r"\s+")
+_RE_WS             = re.compile(r"[ \t]+|\n{3,}")
+_NBSP_TABLE        = str.maketrans({"\u00a0": " "})
+
+# Nome de jogo: palavra capitalizada + 1..5 tokens ASCII (≥2 chars) — varredura linear, sem regex
+_NAME_HEAD  = frozenset(string.ascii_uppercase + "ÁÉÍÓÚÂÊÔÃÕ")
+_NAME_TOKEN = frozenset(string.ascii_letters + string.digits + ":'-")
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────────────────────────────────────
@@ -86,93 +131,272 @@ def now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
 def domain_of(url: str) -> str:
+    # split direto (URLs do feed: sem userinfo/porta); urlparse só para casos estranhos
+    i = url.find("://")
+    start = i + 3 if i >= 0 else 0
+    j = url.find("/", start)
+    host = url[start:(j if j >= 0 else None)].lower()
+    if host and not any(c in host for c in "@:?#"):
+        return host[4:] if host.startswith("www.") else host
     try:
         return urlparse(url).netloc.lower().replace("www.", "")
     except Exception:
         return ""
 
-def safe_get(url: str) -> Optional[requests.Response]:
+def safe_get(url: str, headers: Optional[Dict[str, str]] = None) -> Optional[requests.Response]:
     try:
-        r = requests.get(url, headers=HDRS, timeout=TIMEOUT, allow_redirects=True)
+        r = _SESSION.get(url, headers=headers, timeout=TIMEOUT, allow_redirects=True)
+        if r is not None and r.status_code == 304:
+            return r  # revalidação condicional: corpo vem do cache
         return r if (r is not None and r.text) else None
     except Exception:
         return None
 
+# ──────────────────────────────────────────────────────────────────────────────
+# Cache HTTP em disco (revalida com If-None-Match / If-Modified-Since)
+# ──────────────────────────────────────────────────────────────────────────────
+def _http_cache_path(url: str) -> Path:
+    return HTTP_CACHE_DIR / (hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+def _http_cache_load(url: str) -> Optional[Dict[str, Any]]:
+    try:
+        entry = json.loads(_http_cache_path(url).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    age = now_utc().timestamp() - float(entry.get("fetched_at") or 0)
+    if age > HTTP_CACHE_MAX_DAYS * 86400 or entry.get("url") != url:
+        return None
+    return entry
+
+def _http_cache_store(url: str, r: requests.Response) -> None:
+    etag = r.headers.get("ETag")
+    last_mod = r.headers.get("Last-Modified")
+    if not (r.ok and (etag or last_mod)):
+        return  # sem validadores não há como revalidar depois
+    entry = {
+        "url": url,
+        "etag": etag or "",
+        "last_modified": last_mod or "",
+        "fetched_at": now_utc().timestamp(),
+        "body": r.text,
+    }
+    try:
+        HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        dst = _http_cache_path(url)
+        tmp = dst.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, dst)
+    except Exception:
+        pass
+
+def fetch_html(url: str) -> str:
+    entry = _http_cache_load(url)
+    cond: Dict[str, str] = {}
+    if entry:
+        if entry.get("etag"):
+            cond["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            cond["If-Modified-Since"] = entry["last_modified"]
+    r = safe_get(url, headers=cond or None)
+    if r is None:
+        return entry["body"] if entry else ""
+    if r.status_code == 304:
+        return entry["body"] if entry else ""
+    _http_cache_store(url, r)
+    return r.text
+
+def _ws_repl(m: re.Match) -> str:
+    return "\n\n" if m.group(0)[0] == "\n" else " "
+
 def clean_spaces(s: str) -> str:
-    s = re.sub(r"\u00a0", " ", s)  # nbsp
-    s = re.sub(r"[ \t]+", " ", s)
-    s = re.sub(r"\n{3,}", "\n\n", s)
+    s = s.translate(_NBSP_TABLE)  # nbsp
+    s = _RE_WS.sub(_ws_repl, s)   # [ \t]+ → " " e \n{3,} → "\n\n" numa passada
     return s.strip()
 
 def _strip_boilerplate(node: BeautifulSoup) -> None:
-    kill_classes = re.compile(r"(newsletter|related|promo|share|social|breadcrumbs|post-tags|advert|ads|sidebar)", re.I)
     for tag in node.find_all(["aside","script","style","noscript","iframe","footer","header","nav"]):
         tag.decompose()
-    for div in node.find_all(attrs={"class": kill_classes}):
+    for div in node.find_all(attrs={"class": _RE_KILL_CLASSES}):
         div.decompose()
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Extração principal do artigo
 # ──────────────────────────────────────────────────────────────────────────────
+def _has_related_class(node: BeautifulSoup) -> bool:
+    classes = node.get("class") or []
+    return any(_RE_RELATED_PARENT.search(c) for c in classes) or bool(_RE_RELATED_PARENT.search(" ".join(classes)))
+
 def _pull_text_from_container(node: BeautifulSoup, min_len: int) -> str:
     _strip_boilerplate(node)
+    # o próprio container (ou um ancestral) já é "related/promo…": nada aproveitável
+    if _has_related_class(node) or node.find_parent(attrs={"class": _RE_RELATED_PARENT}):
+        return ""
+    # uma passada descendo a partir dos blocos proibidos, em vez de find_parent por <p>/<li>
+    forbidden = {id(e) for anc in node.find_all(attrs={"class": _RE_RELATED_PARENT}) for e in anc.find_all(["p", "li"])}
     parts: List[str] = []
+    total = 0  # orçamento de caracteres (contador corrente, sem re-somar parts)
     for el in node.find_all(["p", "li"]):
-        if el.find_parent(attrs={"class": re.compile(r"(related|more|promo|newsletter|share)", re.I)}):
+        if id(el) in forbidden:
             continue
-        txt = el.get_text(" ", strip=True)
+        txt = " ".join(el.stripped_strings)
         if not txt:
             continue
-        if re.search(r"(leia mais|assine|newsletter|siga-nos|compartilhe)", txt, re.I):
+        if _RE_LEIA_MAIS.search(txt):
             continue
         # mantém <li> curtos? não — o corpo fica limpo; as listas são tratadas separadamente
         if el.name == "li":
             if len(txt) >= 40:  # só cola no corpo se for descritivo
                 parts.append(txt)
+                total += len(txt)
         else:
             if len(txt) >= 40:
                 parts.append(txt)
-        if sum(len(x) for x in parts) > 24000:
+                total += len(txt)
+        if total > BODY_MAX_CHARS:
             break
     txt = "\n".join(parts).strip()
     return txt if len(txt) >= min_len else ""
 
-def _find_main_container(soup: BeautifulSoup, selectors: List[str]) -> Optional[BeautifulSoup]:
-    for sel in selectors:
-        node = soup.select_one(sel)
+def _find_by_chain(soup: BeautifulSoup, chain: Selector) -> Optional[BeautifulSoup]:
+    node = soup
+    for tag, attrs in chain:
+        node = node.find(tag, attrs=attrs)
+        if not node:
+            return None
+    return node
+
+def _find_main_container(soup: BeautifulSoup, selectors: List[Selector]) -> Optional[BeautifulSoup]:
+    # ordem da lista = prioridade (o primeiro seletor que casa vence, independente de outras páginas)
+    for chain in selectors:
+        node = _find_by_chain(soup, chain)
         if node:
             return node
     node = soup.find("article") or soup.find(attrs={"role": "main"})
     return node
 
-def _extract_from_url_once(url: str) -> Tuple[str, Optional[BeautifulSoup]]:
-    r = safe_get(url)
-    if not r or not r.text:
-        return "", None
-    soup = BeautifulSoup(r.text, "html.parser")
-    host = domain_of(url)
-    cfg = ADAPTERS.get(host)
+def _extract_with_adapter(soup: BeautifulSoup, cfg: Optional[Dict[str, Any]]) -> Tuple[str, Optional[BeautifulSoup]]:
     if cfg:
         container = _find_main_container(soup, cfg["containers"])
         if container:
             txt = _pull_text_from_container(container, cfg["min_len"])
             if txt:
                 return clean_spaces(txt), container
+    return "", None
+
+def _jsonld_article_body(page: str) -> str:
+    if '"articleBody"' not in page:
+        return ""  # busca de substring em C: evita um 2º parse completo nas páginas sem o campo
+    for tag in BeautifulSoup(page, "html.parser", parse_only=LD_JSON_STRAINER).find_all("script"):
+        try:
+            data = json.loads(tag.string or "{}")
+        except Exception:
+            continue
+        if isinstance(data, list):
+            nodes = data
+        elif isinstance(data, dict):
+            nodes = [data] + list(data.get("@graph") or [])
+        else:
+            continue
+        for d in nodes:
+            body = d.get("articleBody") if isinstance(d, dict) else None
+            if isinstance(body, str) and body.strip():
+                return html.unescape(body)
+    return ""
+
+def _extract_from_page(url: str, page: str) -> Tuple[str, Optional[BeautifulSoup]]:
+    if not page:
+        return "", None
+    host = domain_of(url)
+    cfg = ADAPTERS.get(host)
+    # atalho: articleBody do JSON-LD dispensa o scraping de <p>/<li>;
+    # o container ainda é localizado (parse parcial) para as listas/headings
+    ld_body = _jsonld_article_body(page)
+    if len(ld_body) >= (cfg["min_len"] if cfg else 200):
+        container = None
+        if cfg and cfg.get("strainer") is not None:
+            container = _find_main_container(BeautifulSoup(page, "html.parser", parse_only=cfg["strainer"]), cfg["containers"])
+        if container is None:
+            # seletores fora do strainer (ex.: main > article > .content) ou <article>/role=main: parse completo
+            soup = BeautifulSoup(page, "html.parser")
+            if cfg:
+                container = _find_main_container(soup, cfg["containers"])
+            else:
+                container = soup.find("article") or soup.find(attrs={"role": "main"})
+        if container is not None:
+            _strip_boilerplate(container)
+        return clean_spaces(ld_body[:BODY_MAX_CHARS]), container
+    if cfg and cfg.get("strainer") is not None:
+        txt, container = _extract_with_adapter(BeautifulSoup(page, "html.parser", parse_only=cfg["strainer"]), cfg)
+        if txt:
+            return txt, container
+    # fallback: parse completo (temas que embrulham o conteúdo de outro jeito)
+    soup = BeautifulSoup(page, "html.parser")
+    txt, container = _extract_with_adapter(soup, cfg)
+    if txt:
+        return txt, container
     container = soup.find("article") or soup.find(attrs={"role": "main"}) or soup
     txt = _pull_text_from_container(container, 200)
     return clean_spaces(txt), container
 
-def extract_article_body(url: str) -> Tuple[str, Optional[BeautifulSoup]]:
-    txt, container = _extract_from_url_once(url)
+# Pool só para GETs "folha" (não submete nada por dentro → sem risco de deadlock)
+_FETCH_POOL: Optional[ThreadPoolExecutor] = None
+_FETCH_POOL_LOCK = threading.Lock()  # as threads do prefetch chamam _fetch_pool() ao mesmo tempo
+
+def _fetch_pool() -> ThreadPoolExecutor:
+    global _FETCH_POOL
+    with _FETCH_POOL_LOCK:
+        if _FETCH_POOL is None:
+            _FETCH_POOL = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS * 2)
+        return _FETCH_POOL
+
+def _extract_article_body_uncached(url: str) -> Tuple[str, Optional[BeautifulSoup]]:
+    base = url.rstrip("/")
+    if base.endswith("/amp"):
+        return _extract_from_page(url, fetch_html(url))
+    # canônica e /amp baixadas em paralelo (mesma sessão keep-alive): o fallback não custa outro round-trip
+    amp_url = base + "/amp"
+    page, amp_page = _fetch_pool().map(fetch_html, [url, amp_url])
+    txt, container = _extract_from_page(url, page)
     if txt:
         return txt, container
-    if not url.rstrip("/").endswith("/amp"):
-        amp_url = url.rstrip("/") + "/amp"
-        txt2, cont2 = _extract_from_url_once(amp_url)
-        if txt2:
-            return txt2, cont2
+    txt2, cont2 = _extract_from_page(amp_url, amp_page)
+    if txt2:
+        return txt2, cont2
     return txt, container
 
+# Prefetch: extrações em andamento/concluídas por link (IO-bound → thread pool)
+_PREFETCH_POOL: Optional[ThreadPoolExecutor] = None
+_BODY_FUTURES: Dict[str, Future] = {}
+
+def prefetch_article_bodies(links: List[str], max_workers: int = PREFETCH_WORKERS) -> None:
+    """Dispara a extração dos corpos em paralelo, sem bloquear."""
+    global _PREFETCH_POOL
+    if _PREFETCH_POOL is None:
+        _PREFETCH_POOL = ThreadPoolExecutor(max_workers=max_workers)
+    for link in links:
+        if link and link not in _BODY_FUTURES:
+            _BODY_FUTURES[link] = _PREFETCH_POOL.submit(_extract_article_body_uncached, link)
+
+def shutdown_prefetch() -> None:
+    global _PREFETCH_POOL, _FETCH_POOL
+    if _PREFETCH_POOL is not None:
+        _PREFETCH_POOL.shutdown(wait=False, cancel_futures=True)
+        _PREFETCH_POOL = None
+    with _FETCH_POOL_LOCK:
+        if _FETCH_POOL is not None:
+            _FETCH_POOL.shutdown(wait=False, cancel_futures=True)
+            _FETCH_POOL = None
+    _BODY_FUTURES.clear()
+
+def extract_article_body(url: str) -> Tuple[str, Optional[BeautifulSoup]]:
+    fut = _BODY_FUTURES.pop(url, None)
+    if fut is not None:
+        try:
+            return fut.result()
+        except Exception:
+            pass
+    return _extract_article_body_uncached(url)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Listas & títulos de jogos (Flow Games)
 # ──────────────────────────────────────────────────────────────────────────────
@@ -188,12 +412,12 @@ def _extract_ranked_lists_from_flowgames(container: BeautifulSoup) -> List[Dict[
         title = ""
         prev = ol.find_previous(lambda tag: tag.name in ("h1","h2","h3","p","strong"))
         if prev:
-            t = prev.get_text(" ", strip=True)
+            t = " ".join(prev.stripped_strings)
             if t and len(t) >= 6 and not re.search(r"(leia mais|promo|newsletter|publicidade)", t, re.I):
                 title = t
         itens: List[str] = []
         for idx, li in enumerate(lis, 1):
-            txt = li.get_text(" ", strip=True)
+            txt = " ".join(li.stripped_strings)
             txt = re.sub(r"\s+", " ", txt).strip(" .;:+-")
             if not txt or re.search(r"(publicidade|leia mais)", txt, re.I):
                 continue
@@ -213,7 +437,7 @@ def _extract_bullet_game_lists_flowgames(container: BeautifulSoup) -> List[Dict[
             continue
         items: List[str] = []
         for li in lis:
-            txt = li.get_text(" ", strip=True)
+            txt = " ".join(li.stripped_strings)
             if not txt:
                 continue
             txt = re.sub(r"\s+", " ", txt).strip(" .;:+-")
@@ -228,7 +452,7 @@ def _extract_bullet_game_lists_flowgames(container: BeautifulSoup) -> List[Dict[
             title = ""
             prev = ul.find_previous(lambda tag: tag.name in ("h2","h3","h4","p","strong"))
             if prev:
-                t = prev.get_text(" ", strip=True)
+                t = " ".join(prev.stripped_strings)
                 if t and not re.search(r"(leia mais|publicidade)", t, re.I):
                     title = t
             results.append({"titulo_lista": title or "Lista (bullets)", "itens": [f"- {x}" for x in items]})
@@ -255,7 +479,7 @@ def _extract_game_names_flowgames(container: BeautifulSoup) -> List[str]:
     names: List[str] = []
     # OBS: removi <strong> para evitar "LEIA MAIS" em negrito
     for tag in container.find_all(["h2","h3","h4"]):
-        t = tag.get_text(" ", strip=True)
+        t = " ".join(tag.stripped_strings)
         if not t:
             continue
         t = re.sub(r"\s+", " ", t).strip(" .:-–—")
@@ -268,6 +492,35 @@ def _extract_game_names_flowgames(container: BeautifulSoup) -> List[str]:
 # ──────────────────────────────────────────────────────────────────────────────
 # Itens de promoção (heurística)
 # ──────────────────────────────────────────────────────────────────────────────
+def _extract_name(line: str) -> str:
+    """Primeiro trecho "Palavra tok tok…" (1..5 tokens) da linha; vazio se não houver."""
+    n = len(line)
+    for start in range(n):
+        if line[start] not in _NAME_HEAD:
+            continue
+        k = start + 1
+        while k < n and (line[k].isalnum() or line[k] in "_:'-"):
+            k += 1
+        if k == start + 1:
+            continue
+        reps = 0
+        while reps < 5:
+            w = k
+            while w < n and line[w].isspace():
+                w += 1
+            if w == k:
+                break
+            t = w
+            while t < n and line[t] in _NAME_TOKEN:
+                t += 1
+            if t - w < 2:
+                break
+            k = t
+            reps += 1
+        if reps:
+            return line[start:k].strip()
+    return ""
+
 def detect_promo_items(texto: str, limit: int = 24) -> List[Dict[str, str]]:
     if not texto:
         return []
@@ -275,38 +528,38 @@ def detect_promo_items(texto: str, limit: int = 24) -> List[Dict[str, str]]:
     items, seen = [], set()
 
     def clean(s: str) -> str:
-        return re.sub(r"\s+", " ", s).strip(" -–—:•\t ")
+        return _RE_WHITESPACE.sub(" ", s).strip(" -–—:•\t ")
 
     for i, line in enumerate(lines):
-        has_pct = RE_PERCENT.search(line)
-        has_money = RE_MONEY.search(line)
+        has_pct = has_money = mplat = None
+        pieces: List[str] = []
+        last = 0
+        for m in _RE_PROMO.finditer(line):
+            kind = m.lastgroup
+            if kind == "money":
+                has_money = has_money or m
+            elif kind == "pct":
+                has_pct = has_pct or m
+            else:
+                mplat = mplat or m
+            pieces.append(line[last:m.start()])
+            last = m.end()
         if not (has_pct or has_money):
             continue
+        pieces.append(line[last:])
         platform = ""
-        mplat = RE_PLATFORM.search(line)
         if mplat:
             platform = mplat.group(0).title().replace("Psn", "PSN").replace("Playstation", "PlayStation")
 
-        candidate = RE_MONEY.sub("", RE_PERCENT.sub("", RE_PLATFORM.sub("", line)))
-        candidate = re.sub(r"[(){}\[\]]", " ", candidate)
-        candidate = re.sub(r"\b(agora|por|de|até|na|no|por apenas|cada|com|em)\b", " ", candidate, flags=re.I)
-        candidate = re.sub(r"[•\-–—:|]+", " ", candidate)
-        candidate = clean(candidate)
+        candidate = clean(_RE_STRIP.sub(" ", "".join(pieces)))
 
-        mname = re.search(r"([A-ZÁÉÍÓÚÂÊÔÃÕ][\w:'\-]+(?:\s+[A-Za-z0-9:'\-]{2,}){1,5})", candidate)
-        name = mname.group(1).strip() if mname else ""
+        name = _extract_name(candidate)
 
         if not name and i > 0:
-            prev = clean(RE_MONEY.sub("", RE_PERCENT.sub("", lines[i - 1])))
-            m2 = re.search(r"([A-ZÁÉÍÓÚÂÊÔÃÕ][\w:'\-]+(?:\s+[A-Za-z0-9:'\-]{2,}){1,5})", prev)
-            if m2:
-                name = m2.group(1).strip()
+            name = _extract_name(clean(_RE_PRICE.sub("", lines[i - 1])))
 
         if not name and i + 1 < len(lines):
-            nxt = clean(RE_MONEY.sub("", RE_PERCENT.sub("", lines[i + 1])))
-            m3 = re.search(r"([A-ZÁÉÍÓÚÂÊÔÃÕ][\w:'\-]+(?:\s+[A-Za-z0-9:'\-]{2,}){1,5})", nxt)
-            if m3:
-                name = m3.group(1).strip()
+            name = _extract_name(clean(_RE_PRICE.sub("", lines[i + 1])))
 
         if not name:
             continue
@@ -328,36 +581,37 @@ def detect_promo_items(texto: str, limit: int = 24) -> List[Dict[str, str]]:
 # Feed Flow Games (2 dias)
 # ──────────────────────────────────────────────────────────────────────────────
 def fetch_flowgames_only(max_days: int = 2) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    cutoff = now_utc() - timedelta(days=max_days)
-    d = feedparser.parse(FLOW_FEED)
+    found: List[Tuple[Tuple[int, ...], Dict[str, Any]]] = []
+    now = now_utc()
+    cutoff = (now - timedelta(days=max_days)).utctimetuple()[:6]
+    # baixa via sessão (keep-alive) e entrega bytes ao feedparser
+    r = safe_get(FLOW_FEED)
+    d = feedparser.parse(r.content if r is not None and r.status_code != 304 else FLOW_FEED)
     for e in d.entries:
         title = (getattr(e, "title", "") or "").strip()
         link  = (getattr(e, "link", "") or "").strip()
         if not title or not link:
             continue
 
-        pub_dt = None
-        if getattr(e, "published_parsed", None):
-            pub_dt = datetime(*e.published_parsed[:6], tzinfo=timezone.utc)
-        elif getattr(e, "updated_parsed", None):
-            pub_dt = datetime(*e.updated_parsed[:6], tzinfo=timezone.utc)
-
-        if pub_dt and pub_dt < cutoff:
+        # compara struct_time (UTC) como tupla; datetime só para quem passa no corte
+        parsed = getattr(e, "published_parsed", None) or getattr(e, "updated_parsed", None)
+        key: Tuple[int, ...] = tuple(parsed[:6]) if parsed else ()
+        if key and key < cutoff:
             continue
+        pub_dt = datetime(*key, tzinfo=timezone.utc) if key else None
 
-        out.append({
+        found.append((key, {
             "title": title,
             "link": link,
             "published_raw": getattr(e, "published", "") or getattr(e, "updated", ""),
             "published_iso": pub_dt.isoformat() if pub_dt else "",
             "source": "Flow Games",
             "snippet": "",
-            "age_days": round((now_utc() - pub_dt).total_seconds() / 86400, 2) if pub_dt else None
-        })
+            "age_days": round((now - pub_dt).total_seconds() / 86400, 2) if pub_dt else None
+        }))
 
-    out.sort(key=lambda it: it.get("published_iso") or "", reverse=True)
-    return out
+    found.sort(key=lambda kv: kv[0], reverse=True)
+    return [it for _, it in found]
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Persistência e contexto
@@ -481,6 +735,8 @@ def run():
         return
 
     save_list(items)
+    # aquece o corpo dos primeiros artigos enquanto o usuário escolhe
+    prefetch_article_bodies([it["link"] for it in items[:PREFETCH_TOP_K]])
 
     for i, it in enumerate(items, 1):
         age = it.get("age_days")
@@ -492,11 +748,15 @@ def run():
     except Exception:
         idx = 1
     if idx <= 0 or idx > len(items):
+        shutdown_prefetch()
         print("Cancelado."); return
 
     chosen = items[idx - 1]
     save_choice(chosen)
-    ctx = build_context_block(chosen)
+    try:
+        ctx = build_context_block(chosen)
+    finally:
+        shutdown_prefetch()
     save_context(ctx)
 
     print("\n✅ Contexto salvo em:", CTX_PATH)
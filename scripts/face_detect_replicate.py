@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import os, io, math, json, tempfile, pathlib, requests
-from typing import Tuple, Optional, Dict, Any
+import os, io, math, json, tempfile, pathlib, hashlib, time, requests
+from typing import Tuple, Optional, Dict, Any, Union
 from PIL import Image
 import numpy as np
 import replicate
 from dotenv import load_dotenv
 load_dotenv()
 TARGET = 1024
+# escala ≤ 1.5x: BILINEAR é visualmente igual ao LANCZOS e bem mais barato
+NEAR_TARGET_RATIO = 1.5
+FACE_CACHE_DIR = pathlib.Path("assets/.face_cache")  # fora de output/: o backup do pipeline move tudo de lá
 
 def _expand_box(x0,y0,x1,y1,W,H, margin=(0.12,0.35)):
     # margem lateral 12%, margem inferior 35% (mais queixo)
@@ -37,9 +40,11 @@ def _bytes_of_image(path: str) -> bytes:
     with open(path, "rb") as f:
         return f.read()
 
-def _run_replicate_model(slug: str, file_path: str, extra: Optional[Dict[str, Any]] = None):
+def _run_replicate_model(slug: str, image: Union[str, bytes], extra: Optional[Dict[str, Any]] = None):
     client = replicate.Client()
-    input_payload = {"image": open(file_path, "rb")}
+    # aceita caminho ou bytes já lidos (evita reabrir o arquivo a cada detector)
+    data = image if isinstance(image, bytes) else _bytes_of_image(image)
+    input_payload = {"image": io.BytesIO(data)}
     if extra: input_payload.update(extra)
 
     if ":" in slug:
@@ -48,25 +53,63 @@ def _run_replicate_model(slug: str, file_path: str, extra: Optional[Dict[str, An
     else:
         pred = client.predictions.create(model=slug, input=input_payload)
 
-    import time
+    # backoff exponencial: a maioria das detecções termina em <1 s
+    delay = 0.2
     while pred.status in {"starting","processing"}:
-        time.sleep(1.5)
+        time.sleep(delay)
+        delay = min(delay * 1.5, 2.0)
         pred = client.predictions.get(pred.id)
     if pred.error:
         raise RuntimeError(pred.error + (f"\nlogs:\n{pred.logs}" if pred.logs else ""))
     return pred.output
 
 
+def _face_cache_key(b: bytes, main: str, fb: str) -> str:
+    # inclui os slugs: trocar de detector invalida o cache
+    h = hashlib.sha256(b)
+    h.update(f"\0{main}\0{fb}".encode("utf-8"))
+    return h.hexdigest()
+
+def _face_cache_load(key: str) -> Optional[Tuple[int,int,int,int]]:
+    try:
+        data = json.loads((FACE_CACHE_DIR / f"{key}.json").read_text(encoding="utf-8"))
+        x0, y0, x1, y1 = [int(v) for v in data["bbox"]]
+        return x0, y0, x1, y1
+    except Exception:
+        return None
+
+def _face_cache_store(key: str, box: Tuple[int,int,int,int]) -> None:
+    try:
+        FACE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        dst = FACE_CACHE_DIR / f"{key}.json"
+        tmp = dst.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"bbox": list(box)}), encoding="utf-8")
+        os.replace(tmp, dst)
+    except Exception as e:
+        print("[detect] cache não gravado:", e)
+
 def detect_face_bbox(img_path: str) -> Optional[Tuple[int,int,int,int]]:
-    """Tenta detector principal, depois fallback. Retorna (x0,y0,x1,y1)."""
+    """Tenta detector principal, depois fallback. Retorna (x0,y0,x1,y1).
+    Resultados ficam em assets/.face_cache/<sha256>.json (imagem + slugs dos detectores)."""
     b = _bytes_of_image(img_path)
     main = os.getenv("REPLICATE_FACE_DETECTOR","").strip()
     fb   = os.getenv("REPLICATE_FACE_DETECTOR_FALLBACK","").strip()
 
+    key = _face_cache_key(b, main, fb)
+    cached = _face_cache_load(key)
+    if cached is not None:
+        return cached
+    box = _detect_face_bbox_remote(img_path, b, main, fb)
+    if box is not None:
+        _face_cache_store(key, box)
+    return box
+
+def _detect_face_bbox_remote(img_path: str, b: bytes, main: str, fb: str) -> Optional[Tuple[int,int,int,int]]:
+
     # 1) Anime Face Detector (YOLO) → geralmente retorna lista de bboxes [x,y,w,h] ou [x0,y0,x1,y1]
     if main:
         try:
-            out = _run_replicate_model(main, img_path)
+            out = _run_replicate_model(main, b)
             # tolera múltiplos formatos
             # exemplos esperados: [{"bbox":[x,y,w,h], "conf":0.9}, ...]  ou [[x0,y0,x1,y1], ...]
             if isinstance(out, dict) and "boxes" in out:
@@ -106,8 +149,14 @@ def detect_face_bbox(img_path: str) -> Optional[Tuple[int,int,int,int]]:
 
     return None
 
+def _working_mode(im: Image.Image) -> str:
+    # RGBA só quando há alpha de verdade; senão RGB (3 canais = menos banda no resize)
+    if im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info):
+        return "RGBA"
+    return "RGB"
+
 def crop_with_detector(img_path: str, out_png: str) -> str:
-    im = Image.open(img_path).convert("RGBA")
+    im = Image.open(img_path)
     W,H = im.size
     box = detect_face_bbox(img_path)
     if box is None:
@@ -120,7 +169,15 @@ def crop_with_detector(img_path: str, out_png: str) -> str:
         x0,y0,x1,y1 = _expand_box(x0,y0,x1,y1,W,H, margin=(0.14,0.40))
         x0,y0,x1,y1 = _to_square(x0,y0,x1,y1,W,H)
 
-    crop = im.crop((x0,y0,x1,y1)).resize((TARGET,TARGET), Image.LANCZOS)
+    crop = im.crop((x0,y0,x1,y1))
+    mode = _working_mode(im)
+    if crop.mode != mode:
+        crop = crop.convert(mode)  # converte só a região recortada
+    side = max(crop.size)
+    ratio = max(side, TARGET) / max(1, min(side, TARGET))
+    # Pillow-SIMD (drop-in do Pillow) acelera LANCZOS com AVX2 — ver requirements.txt
+    resample = Image.BILINEAR if ratio <= NEAR_TARGET_RATIO else Image.LANCZOS
+    crop = crop.resize((TARGET,TARGET), resample)
     pathlib.Path(out_png).parent.mkdir(parents=True, exist_ok=True)
     crop.save(out_png, "PNG")
     return out_png
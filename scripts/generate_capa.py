@@ -1,12 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os, io, re, json, time, textwrap, random, base64, argparse
+import os, io, re, json, time, textwrap, random, base64, argparse, hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple, Optional
 from dotenv import load_dotenv
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageOps
 from openai import OpenAI
+import numpy as np
+try:
+    import cv2  # type: ignore  # opcional: blur gaussiano separável com SIMD
+except Exception:
+    cv2 = None  # type: ignore
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Paths / Consts
@@ -20,6 +27,7 @@ FONTS   = ASSETS / "fonts"
 P_JOAO = ASSETS / "personagens" / "joao.png"
 P_ZEB  = ASSETS / "personagens" / "zebot.png"
 FONT_PATH = FONTS / "LuckiestGuy-Regular.ttf"
+API_CACHE_DIR = ASSETS / ".api_cache"   # fundos gerados por sha256(model|size|prompt)
 
 MANIFEST = OUT_DIR / "capa_manifest.json"
 CAPA_PNG = OUT_DIR / "capa_tiktok.png"
@@ -30,6 +38,7 @@ DIALOGO_JSON      = OUT_DIR / "dialogo_estruturado.json"
 
 FINAL_SIZE = (1080, 1920)       # TikTok vertical
 BG_SIZE    = (1024, 1536)       # tamanho suportado pela API (vertical)
+CHAR_TILTS = (-2, 0, 2)         # inclinações sorteadas dos personagens (graus)
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Setup
@@ -44,11 +53,13 @@ OUT_DIR.mkdir(parents=True, exist_ok=True)
 # ──────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────────────────────────────────────
+_WS_RE    = re.compile(r"\s+")
+_BRAND_RE = re.compile(r"\b(Apple|iPhone|Samsung|Galaxy|PlayStation|Xbox|Nintendo|Netflix|Spotify|Google|YouTube)\b", re.I)
+
 def sanitize_topic(s: str) -> str:
     if not s: return ""
-    s = re.sub(r"\s+", " ", s).strip()
-    s = re.sub(r"\b(Apple|iPhone|Samsung|Galaxy|PlayStation|Xbox|Nintendo|Netflix|Spotify|Google|YouTube)\b",
-               "marca/plataforma genérica", s, flags=re.I)
+    s = _WS_RE.sub(" ", s).strip()
+    s = _BRAND_RE.sub("marca/plataforma genérica", s)
     return s
 
 def infer_tema_fallback() -> Optional[str]:
@@ -84,24 +95,38 @@ def choose_palette() -> Tuple[Tuple[int,int,int], Tuple[int,int,int]]:
     ]
     return random.choice(options)
 
+@lru_cache(maxsize=8)
+def _clamp_lut(opacity: int) -> Tuple[int, ...]:
+    # LUT de 256 entradas: min(p, opacity) aplicado no caminho C do Image.point
+    return tuple(min(p, opacity) for p in range(256))
+
 def make_shadow(img: Image.Image, blur=10, expand=12, opacity=140) -> Image.Image:
     alpha = img.split()[-1]
     bg = Image.new("RGBA", (img.width + expand*2, img.height + expand*2), (0,0,0,0))
     shadow = Image.new("RGBA", bg.size, (0,0,0,0))
+    if cv2 is not None:
+        # blur + clamp no mesmo buffer numpy (radius do PIL = sigma)
+        arr = np.zeros((bg.height, bg.width), dtype=np.uint8)
+        arr[expand:expand+img.height, expand:expand+img.width] = np.asarray(alpha)
+        arr = cv2.GaussianBlur(arr, (0, 0), sigmaX=blur)
+        np.minimum(arr, opacity, out=arr)
+        shadow.putalpha(Image.fromarray(arr))
+        return shadow
     s = Image.new("L", bg.size, 0)
     s.paste(alpha, (expand, expand))
     s = s.filter(ImageFilter.GaussianBlur(blur))
-    shadow.putalpha(s.point(lambda p: min(p, opacity)))
+    shadow.putalpha(s.point(_clamp_lut(opacity)))
     return shadow
 
 def paste_with_shadow(canvas: Image.Image, sprite: Image.Image, center_xy: Tuple[int,int], scale=1.0, rotate_deg=0):
-    sp = sprite.copy()
+    sp = sprite  # resize/rotate já devolvem imagens novas; alpha_composite só lê
     if scale != 1.0:
         w = max(1, int(sp.width * scale))
         h = max(1, int(sp.height * scale))
         sp = sp.resize((w,h), Image.LANCZOS)
-    if rotate_deg:
-        sp = sp.rotate(rotate_deg, expand=True, resample=Image.BICUBIC)
+    if abs(rotate_deg) > 1:
+        # inclinações de ±1° são sub-pixel nessa escala; acima disso BILINEAR basta
+        sp = sp.rotate(rotate_deg, expand=True, resample=Image.BILINEAR)
     sh = make_shadow(sp, blur=18, expand=24, opacity=120)
     cx, cy = center_xy
     pos = (cx - sp.width//2, cy - sp.height//2)
@@ -110,8 +135,13 @@ def paste_with_shadow(canvas: Image.Image, sprite: Image.Image, center_xy: Tuple
     canvas.alpha_composite(sp,  dest=pos)
 
 # — Texto ————————————————————————————————————————————————————————
+@lru_cache(maxsize=64)
+def _font(size: int) -> ImageFont.FreeTypeFont:
+    # parse do TTF uma vez por tamanho
+    return ImageFont.truetype(str(FONT_PATH), size=size)
+
 def wrap_text(text: str, width_chars=20, max_lines=3, add_ellipsis=False) -> str:
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _WS_RE.sub(" ", text).strip()
     lines = textwrap.wrap(text, width=width_chars, break_long_words=False, break_on_hyphens=True)
     if len(lines) > max_lines:
         lines = lines[:max_lines]
@@ -119,6 +149,26 @@ def wrap_text(text: str, width_chars=20, max_lines=3, add_ellipsis=False) -> str
             lines[-1] = (lines[-1] + "…").strip()
     return "\n".join(lines)
 
+@lru_cache(maxsize=64)
+def wrap_text_px(text: str, size: int, max_px: int, max_lines=3, add_ellipsis=False) -> str:
+    # quebra gulosa pela largura real dos glifos ("W" ≠ "i"), não por contagem de chars
+    font = _font(size)
+    lines, cur = [], ""
+    for word in _WS_RE.sub(" ", text).strip().split(" "):
+        cand = f"{cur} {word}" if cur else word
+        if cur and font.getlength(cand) > max_px:
+            lines.append(cur)
+            cur = word
+        else:
+            cur = cand
+    if cur:
+        lines.append(cur)
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        if add_ellipsis:
+            lines[-1] = (lines[-1] + "…").strip()
+    return "\n".join(lines)
+
 def _measure_line(draw: ImageDraw.ImageDraw, line: str, font: ImageFont.FreeTypeFont):
     if hasattr(draw, "textbbox"):
         l, t, r, b = draw.textbbox((0,0), line, font=font)
@@ -136,38 +186,45 @@ def measure_multiline(draw: ImageDraw.ImageDraw, txt: str, font: ImageFont.FreeT
     total_h = sum(heights) + spacing * (len(lines)-1 if len(lines) > 1 else 0)
     return (max(widths) if widths else 0), total_h
 
-def draw_multiline_center(canvas: Image.Image, txt: str, top: int,
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+@lru_cache(maxsize=256)
+def _measure(txt: str, size: int, spacing: int) -> Tuple[int, int]:
+    return measure_multiline(_MEASURE_DRAW, txt, _font(size), spacing)
+
+def draw_multiline_center(canvas: Image.Image, draw: ImageDraw.ImageDraw, txt: str, top: int,
                           fill=(255,255,0), stroke=(0,0,0), stroke_w=12,
                           max_font=148, min_font=60, max_width_ratio=0.97):
-    draw = ImageDraw.Draw(canvas)
     W, H = canvas.size
-    chosen_font = None; w = h = 0
-    for size in range(max_font, min_font-1, -4):
-        font = ImageFont.truetype(str(FONT_PATH), size=size)
-        w, h = measure_multiline(draw, txt, font, spacing=int(size*0.12))
-        if w <= int(W*max_width_ratio):
-            chosen_font = font
-            break
-    if chosen_font is None:
-        chosen_font = ImageFont.truetype(str(FONT_PATH), size=min_font)
-        w, h = measure_multiline(draw, txt, chosen_font, spacing=int(min_font*0.12))
+    # largura cresce com o tamanho: busca binária na mesma grade (max_font, max_font-4, …, ≥min_font)
+    sizes = list(range(max_font, min_font-1, -4))
+    max_w = int(W*max_width_ratio)
+    lo, hi = 0, len(sizes)  # primeiro índice cujo tamanho cabe
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _measure(txt, sizes[mid], int(sizes[mid]*0.12))[0] <= max_w:
+            hi = mid
+        else:
+            lo = mid + 1
+    size = sizes[lo] if lo < len(sizes) else min_font
+    chosen_font = _font(size)
+    w, h = _measure(txt, size, int(size*0.12))
     x = (W - w)//2
     draw.multiline_text((x, top), txt, font=chosen_font, fill=fill,
                         stroke_width=stroke_w, stroke_fill=stroke,
                         align="center", spacing=int(chosen_font.size*0.12))
     return x, top, w, h, chosen_font
 
-def draw_tag(canvas: Image.Image, text: str, anchor_xy: Tuple[int,int],
+def draw_tag(canvas: Image.Image, draw: ImageDraw.ImageDraw, text: str, anchor_xy: Tuple[int,int],
              font: ImageFont.FreeTypeFont, pad_x=26, pad_y=10,
              fill=(0,0,0), text_fill=(255,255,255), radius=28):
     if not text: return
-    draw = ImageDraw.Draw(canvas)
     w, h = draw.textbbox((0,0), text, font=font)[2:]
     box_w = w + pad_x*2
     box_h = h + pad_y*2
     x, y = anchor_xy
     capsule = Image.new("RGBA", (box_w, box_h), (0,0,0,0))
-    d = ImageDraw.Draw(capsule)
+    d = ImageDraw.Draw(capsule)  # a cápsula é outra imagem: draw próprio
     d.rounded_rectangle([0,0,box_w-1,box_h-1], radius=radius, fill=fill)
     glow = capsule.filter(ImageFilter.GaussianBlur(8))
     canvas.alpha_composite(glow, (x, y))
@@ -182,19 +239,40 @@ def prompt_background(tema: str) -> str:
         "cores chamativas porém equilibradas, profundidade sutil, composição limpa, 1024x1536"
     )
 
-def gen_background_via_openai(prompt: str, tries=3) -> Image.Image:
+def _api_cache_path(model: str, size: str, prompt: str) -> Path:
+    key = hashlib.sha256(f"{model}|{size}|{prompt}".encode("utf-8")).hexdigest()
+    return API_CACHE_DIR / f"{key}.png"
+
+def _open_rgba(src) -> Image.Image:
+    img = Image.open(src)
+    img.load()  # decodifica já (o buffer pode ser descartado)
+    return img if img.mode == "RGBA" else img.convert("RGBA")
+
+def gen_background_via_openai(prompt: str, tries=3, use_cache=True) -> Image.Image:
+    model, size = "gpt-image-1", f"{BG_SIZE[0]}x{BG_SIZE[1]}"
+    cached = _api_cache_path(model, size, prompt)
+    if use_cache and cached.exists():
+        return _open_rgba(cached)
     last_err = None
     for attempt in range(1, tries+1):
         try:
             resp = client.images.generate(
-                model="gpt-image-1",
+                model=model,
                 prompt=prompt,
-                size=f"{BG_SIZE[0]}x{BG_SIZE[1]}",
+                size=size,
                 background="transparent"
             )
             b64 = resp.data[0].b64_json
-            img = Image.open(io.BytesIO(base64.b64decode(b64))).convert("RGBA")
-            return img
+            raw = base64.b64decode(b64, validate=False)
+            if use_cache:
+                try:
+                    API_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                    tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+                    tmp.write_bytes(raw)
+                    os.replace(tmp, cached)
+                except Exception as e:
+                    print(f"⚠️ Cache do fundo não gravado: {e}")
+            return _open_rgba(io.BytesIO(raw))
         except Exception as e:
             last_err = e
             time.sleep(1.0 * attempt)
@@ -205,7 +283,7 @@ def resize_cover(img: Image.Image, target_size: Tuple[int,int]) -> Image.Image:
     iw, ih = img.size
     scale = max(tw/iw, th/ih)
     nw, nh = int(iw*scale), int(ih*scale)
-    resized = img.resize((nw, nh), Image.LANCZOS)
+    resized = img.resize((nw, nh), Image.BICUBIC)  # fundo editorial: indistinguível do LANCZOS, bem mais barato
     left = max(0, (nw - tw)//2); top = max(0, (nh - th)//2)
     return resized.crop((left, top, left+tw, top+th))
 
@@ -224,10 +302,11 @@ def main():
     ap.add_argument("--chars-scale", type=float, default=1.0, help="Escala global dos personagens")
     ap.add_argument("--chars-shift-y", type=int, default=0, help="Deslocamento vertical dos personagens (px)")
     # NOVOS CONTROLES DE TÍTULO
-    ap.add_argument("--title-width-chars", type=int, default=20, help="Chars por linha do título (wrap)")
+    ap.add_argument("--title-width-chars", type=int, default=20, help="(legado) o título agora quebra pela largura em pixels")
     ap.add_argument("--title-max-lines", type=int, default=3, help="Máximo de linhas do título")
     ap.add_argument("--title-max-width", type=float, default=0.97, help="Largura máx. do título em fração da largura (0..1)")
     ap.add_argument("--ellipsis", action="store_true", help="Adicionar reticências se o título exceder linhas")
+    ap.add_argument("--no-cache", action="store_true", help="Ignora o cache de fundos em assets/.api_cache")
     args = ap.parse_args()
 
     tema = args.tema or infer_tema_fallback() or "Tecnologia em destaque"
@@ -236,12 +315,18 @@ def main():
 
     # 1) Fundo 1024x1536 → cover 1080x1920 (+blur opcional)
     bg_prompt = prompt_background(tema)
-    bg = gen_background_via_openai(bg_prompt)
+    bg = gen_background_via_openai(bg_prompt, use_cache=not args.no_cache)
     bg_cover = resize_cover(bg, FINAL_SIZE)
     if args.blur and args.blur > 0:
         bg_cover = bg_cover.filter(ImageFilter.GaussianBlur(radius=min(25, max(0, args.blur))))
-    canvas = Image.new("RGBA", FINAL_SIZE, (0,0,0,255))
-    canvas.alpha_composite(bg_cover, (0,0))
+    if bg_cover.mode == "RGBA" and bg_cover.getchannel("A").getextrema() == (255, 255):
+        canvas = bg_cover  # fundo já opaco: nada a mesclar sobre o preto
+    else:
+        # o fundo é pedido com background="transparent": pode ter áreas vazadas
+        canvas = Image.new("RGBA", FINAL_SIZE, (0,0,0,255))
+        canvas.alpha_composite(bg_cover.convert("RGBA"), (0,0))
+
+    draw = ImageDraw.Draw(canvas)  # um único contexto de desenho para título/subtítulo/tag
 
     # 2) Personagens (distribuição)
     if not P_JOAO.exists() or not P_ZEB.exists():
@@ -255,34 +340,35 @@ def main():
     base_h = int(base_h * max(0.6, min(1.6, args.chars_scale)))
     def scale_to_h(img, h):
         r = h / img.height
-        return img.resize((max(1,int(img.width*r)), max(1,int(img.height*r))), Image.LANCZOS)
+        # LANCZOS só ao ampliar; na redução o BILINEAR do Pillow já faz antialias
+        resample = Image.LANCZOS if r > 1.0 else Image.BILINEAR
+        return img.resize((max(1,int(img.width*r)), max(1,int(img.height*r))), resample)
     joao_s = scale_to_h(joao, base_h)
     zeb_s  = scale_to_h(zeb,  base_h)
 
     cy = int(FINAL_SIZE[1] * 0.66) + args.chars_shift_y
     paste_with_shadow(canvas, joao_s, center_xy=(int(FINAL_SIZE[0]*0.28), cy),
-                      scale=1.0, rotate_deg=random.choice([-3,-2,-1,0,1,2,3]))
+                      scale=1.0, rotate_deg=random.choice(CHAR_TILTS))
     paste_with_shadow(canvas, zeb_s,  center_xy=(int(FINAL_SIZE[0]*0.72), cy),
-                      scale=1.0, rotate_deg=random.choice([-3,-2,-1,0,1,2,3]))
+                      scale=1.0, rotate_deg=random.choice(CHAR_TILTS))
 
     # 3) Título (grande) + Subtítulo
-    title_wrapped = wrap_text(
-        titulo,
-        width_chars=max(10, args.title_width_chars),
+    title_ratio = max(0.80, min(1.0, args.title_max_width))
+    title_wrapped = wrap_text_px(
+        titulo, 100, int(FINAL_SIZE[0] * title_ratio * 0.8),
         max_lines=max(1, args.title_max_lines),
         add_ellipsis=args.ellipsis
     )
     fill_rgb, stroke_rgb = choose_palette()
     tx, ty, tw, th, title_font = draw_multiline_center(
-        canvas, title_wrapped, top=int(FINAL_SIZE[1]*0.06),
+        canvas, draw, title_wrapped, top=int(FINAL_SIZE[1]*0.06),
         fill=fill_rgb, stroke=stroke_rgb, stroke_w=12,
-        max_font=148, min_font=60, max_width_ratio=max(0.80, min(1.0, args.title_max_width))
+        max_font=148, min_font=60, max_width_ratio=title_ratio
     )
 
     if subtitulo.strip():
-        draw = ImageDraw.Draw(canvas)
         sub_size = max(48, int(title_font.size * 0.52))
-        sub_font = ImageFont.truetype(str(FONT_PATH), size=sub_size)
+        sub_font = _font(sub_size)
         sub_text = wrap_text(subtitulo, width_chars=22, max_lines=2, add_ellipsis=args.ellipsis)
         sw, sh = measure_multiline(draw, sub_text, sub_font, spacing=int(sub_size*0.10))
         sx = (FINAL_SIZE[0]-sw)//2
@@ -293,15 +379,22 @@ def main():
 
     # 4) Tag de destaque (opcional)
     if getattr(args, "destaque", "").strip():
-        tag_font = ImageFont.truetype(str(FONT_PATH), size=max(44, int(title_font.size*0.55)))
+        tag_font = _font(max(44, int(title_font.size*0.55)))
         tag_x = min(FINAL_SIZE[0]-360, tx + tw + 18)
         tag_y = max(20, ty - 12)
-        draw_tag(canvas, args.destaque.strip(), (tag_x, tag_y), tag_font,
+        draw_tag(canvas, draw, args.destaque.strip(), (tag_x, tag_y), tag_font,
                  pad_x=22, pad_y=10, fill=(0,0,0,190), text_fill=(255,255,0))
 
     # 5) Exporta
-    canvas.save(CAPA_PNG, "PNG")
-    canvas.convert("RGB").save(CAPA_JPG, "JPEG", quality=92)
+    # PNG (zlib) e JPEG (DCT) são independentes e o encoder do PIL solta o GIL
+    def save_jpg():
+        # o descarte do alpha roda na thread do JPEG, em paralelo ao zlib do PNG
+        rgb = canvas.convert("RGB", dither=Image.NONE)
+        rgb.save(CAPA_JPG, "JPEG", quality=92, subsampling=2, optimize=False)
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_png = ex.submit(canvas.save, CAPA_PNG, "PNG")
+        f_jpg = ex.submit(save_jpg)
+        f_png.result(); f_jpg.result()
 
     meta = {
         "tema": tema,
@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os, json, re, base64, time, urllib.parse
+import os, json, re, base64, time, hashlib, shutil, argparse, threading, importlib.util, urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, List, Tuple, Optional
 from PIL import Image
 import requests
+from requests.adapters import HTTPAdapter
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
-from bs4 import BeautifulSoup
+from openai import OpenAI, RateLimitError
+from bs4 import BeautifulSoup, SoupStrainer
+try:
+    import orjson  # encode/decode em Rust: 2-5x mais rápido que o json da stdlib
+except Exception:
+    orjson = None
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Config
@@ -17,7 +24,6 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise RuntimeError("Defina OPENAI_API_KEY no .env")
-client = OpenAI(api_key=OPENAI_API_KEY)
 
 DIALOGO_JSON_PATH = Path("output/dialogo_estruturado.json")
 PLANO_JSON_PATH   = Path("output/imagens_plano.json")          # agora traz tipo/official_query
@@ -25,8 +31,18 @@ OUT_RAW           = Path("assets/imagens_geradas")
 OUT_FINAL         = Path("assets/imagens_geradas_padronizadas")
 OUT_FOR_VIDEO     = Path("output")                              # cópia quadrada para o vídeo
 MANIFEST_PATH     = Path("output/imagens_manifest.json")
+MANIFEST_PARCIAL  = Path("output/imagens_manifest.jsonl")     # 1 linha por imagem pronta (sobrevive a crash)
+API_CACHE_DIR     = Path("assets/.api_cache")                   # gerações por sha256(model|size|prompt)
+OG_CACHE_DIR      = Path("assets/.og_cache")                    # og:image por URL e arte por query (sha256)
+OG_CACHE_MAX_DAYS = 7
 
 SIZE = (1024, 1024)  # tamanho padrão
+IMG_CONCURRENCY = max(1, int(os.getenv("IMG_CONCURRENCY", "4")))  # buscas/gerações simultâneas (I/O-bound)
+PAD_WORKERS     = max(1, os.cpu_count() or 1)  # padronização (PIL solta o GIL no resize/encode)
+IMG_BATCH_MAX   = 10  # n máximo por requisição de imagens (prompts idênticos)
+IMG_MODEL       = "gpt-image-1"
+IMG_SIZE        = "1024x1024"
+USE_API_CACHE   = True  # --no-cache desliga
 UA = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                     "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"}
 
@@ -39,6 +55,38 @@ PREFERRED_HOSTS = (
 for p in (OUT_RAW, OUT_FINAL, OUT_FOR_VIDEO):
     p.mkdir(parents=True, exist_ok=True)
 
+OG_FETCH_WORKERS = 10  # páginas de resultado do DDG abertas em paralelo
+
+# sessão única (keep-alive/TLS reaproveitados entre buscas e threads)
+_SESSION = requests.Session()
+_SESSION.headers.update(UA)
+_ADAPTER = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+_OG_POOL: Optional[ThreadPoolExecutor] = None
+_OG_POOL_LOCK = threading.Lock()
+
+# parser em C quando disponível (3-5x mais rápido); html.parser segue como fallback
+BS_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+OG_STRAINER  = SoupStrainer(["meta", "img"])  # só o que _fetch_og_image consulta
+DDG_STRAINER = SoupStrainer("a")              # links de resultado
+
+def _http_client(max_connections: int) -> httpx.Client:
+    # pool keep-alive único para todas as chamadas/retries (TLS só no 1º request);
+    # HTTP/2 (multiplexação) apenas se o extra httpx[http2] estiver instalado
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except Exception:
+        http2 = False
+    return httpx.Client(
+        http2=http2,
+        limits=httpx.Limits(max_keepalive_connections=max_connections, max_connections=max_connections*2),
+        timeout=httpx.Timeout(300.0, connect=10.0),  # geração de imagem pode passar de 60s
+    )
+
+client = OpenAI(api_key=OPENAI_API_KEY, http_client=_http_client(max(20, IMG_CONCURRENCY)))
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────────────────────────────────────
@@ -46,16 +94,67 @@ for p in (OUT_RAW, OUT_FINAL, OUT_FOR_VIDEO):
 def padronizar_imagem(src: Path, dst: Path, size: Tuple[int,int]=(1024,1024)):
     """Redimensiona em RGB (sem transparência) e salva com boa qualidade."""
     with Image.open(src) as img:
-        img = img.convert("RGB")
-        img = img.resize(size, Image.LANCZOS)
-        img.save(dst, quality=95)
+        if img.format == "PNG" and img.mode == "RGB" and img.size == size and dst.suffix.lower() == ".png":
+            ready = True  # já está no formato final: copiar bytes em vez de re-encodar
+        else:
+            ready = False
+            if img.format == "JPEG":
+                # arte oficial 2048+ px: o libjpeg decodifica já em 1/2, 1/4… (mantendo ≥ 2x o alvo)
+                img.draft("RGB", (size[0] * 2, size[1] * 2))
+            img = img.convert("RGB")
+            if img.size != size:  # gpt-image-1 já vem em 1024x1024
+                # reducing_gap: redução grossa em BOX (barata) e só o fator final em LANCZOS
+                img = img.resize(size, Image.LANCZOS, reducing_gap=2.0)
+            # compress_level=1: zlib rápido (arquivo intermediário, ~20% maior)
+            img.save(dst, quality=95, compress_level=1)
+    if ready:
+        shutil.copyfile(src, dst)
+
+def padronizar_e_copiar(src: Path, dst: Path, copia: Path, size: Tuple[int,int]=(1024,1024)):
+    """Padroniza uma vez e copia o arquivo pronto (as duas saídas são idênticas)."""
+    padronizar_imagem(src, dst, size)
+    shutil.copyfile(dst, copia)
+
+def padronizar_ou_gerar(raw_path: Path, dst: Path, copia: Path, slot: int, tipo: str, prompt_final: str) -> str:
+    """Padroniza; arte oficial truncada/corrompida (só aparece no decode) cai para a IA com o
+    mesmo número de saída, sem buraco na sequência imagem_NN. Devolve o tipo efetivamente usado."""
+    try:
+        padronizar_e_copiar(raw_path, dst, copia, SIZE)
+        return tipo or "ai"
+    except Exception as e:
+        if tipo != "official":
+            raise
+        print(f"   [{slot}] ⚠️ Arte oficial ilegível ({e}) — gerando por IA…")
+    padronizar_e_copiar(generate_ai_image(prompt_final, slot, tries=3), dst, copia, SIZE)
+    return "ai"
 
 def load_json(path: Path, default):
     if path.exists():
+        if orjson is not None:
+            return orjson.loads(path.read_bytes())
         with path.open("r", encoding="utf-8") as f:
             return json.load(f)
     return default
 
+def _json_line(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+def _ler_parcial() -> List[Dict[str, Any]]:
+    """Linhas do sidecar JSONL (vazio se não existe); a última pode ter sido cortada por um crash."""
+    linhas = []
+    try:
+        with MANIFEST_PARCIAL.open("rb") as f:
+            for ln in f:
+                try:
+                    linhas.append(json.loads(ln))
+                except ValueError:
+                    pass
+    except OSError:
+        pass
+    return linhas
+
 def _to_str(v) -> str:
     if v is None:
         return ""
@@ -82,13 +181,15 @@ def build_style_prefix(plano: Dict[str,Any]) -> str:
     parts.append("composição centrada, legível em tela pequena, iluminação balanceada")
     return ", ".join(p for p in parts if p)
 
+# substring (sem \b): "produtos", "supercomputador" etc. também contam, como antes
+_REALISTAS_RE = re.compile("|".join(map(re.escape, [
+    "smartphone","computador","drone","carro","servidor","fotografia","produto",
+    "dispositivo","hardware","gameplay","realista","cinematográfica","marketing"
+])), re.I)
+
 def choose_style_tail(prompt_base: str, allow_logo: bool) -> str:
     """Cauda de prompt (realista x ilustrativo). Não força 'sem logotipos' quando allow_logo=True."""
-    realistas = [
-        "smartphone","computador","drone","carro","servidor","fotografia","produto",
-        "dispositivo","hardware","gameplay","realista","cinematográfica","marketing"
-    ]
-    is_real = any(w in prompt_base.lower() for w in realistas)
+    is_real = bool(_REALISTAS_RE.search(prompt_base))
     base_tail = ("estilo foto editorial realista, iluminação cinematográfica, alta nitidez, profundidade de campo, 1024x1024"
                  if is_real else
                  "ilustração vetorial/flat moderna, traços limpos, cores vivas equilibradas, sombras sutis, 1024x1024")
@@ -96,16 +197,19 @@ def choose_style_tail(prompt_base: str, allow_logo: bool) -> str:
         base_tail += ", sem logotipos, sem marcas registradas"
     return base_tail
 
+_WS_RE    = re.compile(r"\s+")
+_TEXTO_RE = re.compile(r"\btexto\b.*?(?:[.,]|$)", re.I)
+
 def sanitize_prompt(p: str, allow_logo: bool=False) -> str:
     """Limpa excessos mas NÃO bloqueia logo quando for permitido."""
     if not p:
         return ""
-    p = re.sub(r"\s+", " ", p).strip()
+    p = _WS_RE.sub(" ", p).strip()
     if not allow_logo:
         # remove pedidos longos de texto
-        p = re.sub(r"\btexto\b.*?(?:[.,]|$)", "", p, flags=re.I)
+        p = _TEXTO_RE.sub("", p)
         # força 'sem logos' se não for oficial
-        if "sem logotipo" not in p.lower() and "sem logotipos" not in p.lower():
+        if "sem logotipo" not in p.lower():  # também cobre "sem logotipos"
             p = f"{p} | sem logotipos, sem marcas registradas"
     return p.strip(" .|")
 
@@ -113,11 +217,46 @@ def sanitize_prompt(p: str, allow_logo: bool=False) -> str:
 # Busca de ARTE OFICIAL
 # ──────────────────────────────────────────────────────────────────────────────
 
+def _og_cache_path(kind: str, key: str) -> Path:
+    return OG_CACHE_DIR / f"{kind}_{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+def _og_cache_load(kind: str, key: str) -> Optional[Dict[str, Any]]:
+    """Só o resultado (URL da imagem) fica em disco, não a página. None = miss/expirado/--no-cache."""
+    if not USE_API_CACHE:
+        return None
+    try:
+        entry = json.loads(_og_cache_path(kind, key).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if time.time() - float(entry.get("at") or 0) > OG_CACHE_MAX_DAYS * 86400 or entry.get("key") != key:
+        return None
+    return entry
+
+def _og_cache_store(kind: str, key: str, value: str) -> None:
+    try:
+        OG_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        dst = _og_cache_path(kind, key)
+        tmp = dst.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"key": key, "value": value, "at": time.time()}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, dst)
+    except Exception:
+        pass
+
 def _extract_og_image(url: str) -> Optional[str]:
+    entry = _og_cache_load("og", url)
+    if entry is not None:
+        return entry.get("value") or None  # "" = página sem imagem (também cacheado)
+    img = _fetch_og_image(url)
+    if img is not False:
+        _og_cache_store("og", url, img or "")
+    return img or None
+
+def _fetch_og_image(url: str):
+    """URL da imagem, None se a página não tem, False em erro de rede/parse (não cacheia)."""
     try:
-        r = requests.get(url, headers=UA, timeout=10)
+        r = _SESSION.get(url, timeout=10)
         r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
+        soup = BeautifulSoup(r.text, BS_PARSER, parse_only=OG_STRAINER)
         for sel in [
             ('meta[property="og:image"]', "content"),
             ('meta[name="twitter:image"]', "content")
@@ -138,7 +277,7 @@ def _extract_og_image(url: str) -> Optional[str]:
         if best:
             return best
     except Exception:
-        return None
+        return False
     return None
 
 def _resolve_ddg_redirect(href: str) -> str:
@@ -152,53 +291,105 @@ def _resolve_ddg_redirect(href: str) -> str:
         pass
     return href
 
+# peso de cada host preferido (o primeiro da lista vale mais), calculado uma vez
+_PREFERRED_RANK = tuple((pref, 10 + i) for i, pref in enumerate(reversed(PREFERRED_HOSTS), start=1))
+
 def _score_host(url: str) -> int:
     try:
         host = urllib.parse.urlparse(url).netloc.lower()
     except Exception:
         return 0
-    score = 0
-    for i, pref in enumerate(PREFERRED_HOSTS[::-1], start=1):
-        if host.endswith(pref):
-            score += 10 + i  # preferidos > outros
-    return score
+    if not host.endswith(PREFERRED_HOSTS):  # caso comum: um único endswith(tuple) em C
+        return 0
+    # soma como antes (www.callofduty.com casa com os dois sufixos): preferidos > outros
+    return sum(rank for pref, rank in _PREFERRED_RANK if host.endswith(pref))
+
+def _og_pool() -> ThreadPoolExecutor:
+    # pool próprio: quem chama já roda dentro do pool de IMG_CONCURRENCY
+    # chamado de várias threads ao mesmo tempo: lock para não criar (e vazar) pools extras
+    global _OG_POOL
+    with _OG_POOL_LOCK:
+        if _OG_POOL is None:
+            _OG_POOL = ThreadPoolExecutor(max_workers=OG_FETCH_WORKERS)
+        return _OG_POOL
+
+_QUERY_FUTS: Dict[str, Future] = {}  # query normalizada -> resultado (em voo ou pronto) nesta execução
+_QUERY_LOCK = threading.Lock()
 
 def buscar_arte_oficial_por_query(query: str) -> Optional[str]:
+    """Mesma franquia em várias falas: uma única busca por execução, mesmo entre threads."""
+    key = _WS_RE.sub(" ", query).strip().lower()
+    with _QUERY_LOCK:
+        fut = _QUERY_FUTS.get(key)
+        dono = fut is None
+        if dono:
+            fut = _QUERY_FUTS[key] = Future()
+    if not dono:
+        return fut.result()  # outra thread já buscou (ou está buscando) essa query
+    res = None
+    try:
+        res = _buscar_arte_oficial(query)
+    finally:
+        fut.set_result(res)
+    return res
+
+def _buscar_arte_oficial(query: str) -> Optional[str]:
     """
     Estratégia simples:
     1) Busca HTML do DuckDuckGo (sem token).
     2) Abre o primeiro(s) resultado(s), pega og:image/twitter:image.
     3) Prefere hosts da lista PREFERRED_HOSTS.
     """
+    entry = _og_cache_load("query", query)
+    if entry is not None and entry.get("value"):
+        return entry["value"]
     try:
         qurl = f"https://duckduckgo.com/html/?q={urllib.parse.quote_plus(query)}"
-        r = requests.get(qurl, headers=UA, timeout=10)
+        r = _SESSION.get(qurl, timeout=10)
         r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        candidates = []
+        soup = BeautifulSoup(r.text, BS_PARSER, parse_only=DDG_STRAINER)
+        urls = []
         for a in soup.select("a.result__a, a.result__url"):
             href = a.get("href")
             if not href: continue
-            url = _resolve_ddg_redirect(href)
-            img = _extract_og_image(url)
+            urls.append(_resolve_ddg_redirect(href))
+        # abre todos os resultados de uma vez (1 RTT em vez de N); map preserva a ordem
+        candidates = []
+        for url, img in zip(urls, _og_pool().map(_extract_og_image, urls)):
             if img:
                 candidates.append((url, img, _score_host(url)))
         if not candidates:
             return None
         # escolhe o de maior score de host; se empate, o primeiro
         candidates.sort(key=lambda x: x[2], reverse=True)
+        _og_cache_store("query", query, candidates[0][1])  # só acertos: falha pode ser transitória
         return candidates[0][1]
     except Exception:
         return None
 
+_MAGIC = (b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a")
+
+def _magic_ok(path: Path) -> bool:
+    """Assinatura de imagem nos primeiros 12 bytes (PNG/JPEG/GIF/WEBP). O decode completo fica
+    para padronizar_imagem, que já abre o arquivo de qualquer forma."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(12)
+    except OSError:
+        return False
+    return head.startswith(_MAGIC) or (head[:4] == b"RIFF" and head[8:12] == b"WEBP")
+
 def baixar_imagem(url: str, dest: Path) -> bool:
     try:
-        r = requests.get(url, headers=UA, timeout=15)
-        r.raise_for_status()
-        with open(dest, "wb") as f:
-            f.write(r.content)
-        # valida abertura
-        Image.open(dest).verify()
+        # streaming: memória constante e escrita em disco sobreposta à recepção
+        with _SESSION.get(url, timeout=15, stream=True) as r:
+            r.raise_for_status()
+            with open(dest, "wb") as f:
+                for chunk in r.iter_content(chunk_size=64 * 1024):  # decodifica gzip, ao contrário de r.raw
+                    f.write(chunk)
+        # HTML de erro/bloqueio com status 200 é o caso comum: checa a assinatura
+        if not _magic_ok(dest):
+            raise ValueError("não é imagem")
         return True
     except Exception:
         if dest.exists():
@@ -209,31 +400,137 @@ def baixar_imagem(url: str, dest: Path) -> bool:
 # Geração por IA
 # ──────────────────────────────────────────────────────────────────────────────
 
-def generate_ai_image(prompt: str, idx: int, tries: int = 2) -> Path:
-    """Gera imagem com gpt-image-1 (b64) com retry simples."""
+def _api_cache_path(prompt: str, variant: int = 0) -> Path:
+    # variante > 0: n-ésima imagem do mesmo prompt (lotes n=k não repetem a mesma imagem)
+    key = f"{IMG_MODEL}|{IMG_SIZE}|{prompt}" + (f"|{variant}" if variant else "")
+    return API_CACHE_DIR / (hashlib.sha256(key.encode("utf-8")).hexdigest() + ".png")
+
+def _api_cache_store(raw_path: Path, cached: Path) -> None:
+    try:
+        API_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+        shutil.copyfile(raw_path, tmp)
+        os.replace(tmp, cached)
+    except Exception as e:
+        print(f"   ⚠️ Cache não gravado: {e}")
+
+def _retry_delay(err: Exception, attempt: int) -> float:
+    """Espera antes do próximo retry: respeita retry-after em 429, senão backoff exponencial."""
+    if isinstance(err, RateLimitError):
+        try:
+            ra = float(err.response.headers.get("retry-after", ""))
+            return min(60.0, max(0.5, ra))
+        except Exception:
+            pass
+        return min(60.0, 2.0 * (2 ** (attempt - 1)))
+    return min(10.0, 1.2 * (2 ** (attempt - 1)))
+
+def generate_ai_images(prompt: str, idxs: List[int], tries: int = 2,
+                       variants: Optional[List[int]] = None) -> Dict[int, Path]:
+    """Gera len(idxs) variações do mesmo prompt numa única chamada (n=k), com retry simples.
+    Variações já em cache são copiadas sem chamar a API. Pode faltar índice se a API retornar menos imagens."""
+    variants = list(variants) if variants is not None else list(range(len(idxs)))
+    paths: Dict[int, Path] = {}
+    pending: List[Tuple[int, int]] = []
+    for idx, v in zip(idxs, variants):
+        raw_path = OUT_RAW / f"img_raw_{idx:02}.png"
+        cached = _api_cache_path(prompt, v)
+        if USE_API_CACHE and cached.exists():
+            shutil.copyfile(cached, raw_path)
+            paths[idx] = raw_path
+        else:
+            pending.append((idx, v))
+    if not pending:
+        return paths
+
     last_err = None
     for attempt in range(1, tries+1):
         try:
             resp = client.images.generate(
-                model="gpt-image-1",
+                model=IMG_MODEL,
                 prompt=prompt,
-                size="1024x1024"  # quadrado, fundo opaco será feito na padronização
+                size=IMG_SIZE,  # quadrado, fundo opaco será feito na padronização
+                n=len(pending),
             )
-            b64 = resp.data[0].b64_json
-            raw_path = OUT_RAW / f"img_raw_{idx:02}.png"
-            with open(raw_path, "wb") as f:
-                f.write(base64.b64decode(b64))
-            return raw_path
+            for (idx, v), d in zip(pending, resp.data):
+                raw_path = OUT_RAW / f"img_raw_{idx:02}.png"
+                with open(raw_path, "wb") as f:
+                    f.write(base64.b64decode(d.b64_json, validate=False))
+                if USE_API_CACHE:
+                    _api_cache_store(raw_path, _api_cache_path(prompt, v))
+                paths[idx] = raw_path
+            return paths
         except Exception as e:
             last_err = e
-            time.sleep(1.2 * attempt)
+            if attempt < tries:
+                time.sleep(_retry_delay(e, attempt))
     raise last_err
 
+def generate_ai_image(prompt: str, idx: int, tries: int = 2, variant: int = 0) -> Path:
+    """Gera imagem com gpt-image-1 (b64) com retry simples."""
+    paths = generate_ai_images(prompt, [idx], tries=tries, variants=[variant])
+    if idx not in paths:
+        raise RuntimeError("API não retornou imagem")
+    return paths[idx]
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Execução
 # ──────────────────────────────────────────────────────────────────────────────
 
+def obter_imagem_raw(slot: int, i: int, item: Dict[str, Any], tipo: str, prompt_final: str,
+                     variant: int = 0) -> Optional[Path]:
+    """Arte oficial (quando tipo=official) ou geração por IA. Roda numa thread do pool.
+    variant: posição do slot entre os prompts idênticos (chave de cache distinta por variação)."""
+    # 1) Se oficial: tenta baixar uma arte oficial via queries
+    if tipo == "official":
+        queries = []
+        if item.get("official_query"):          queries.append(item["official_query"])
+        if item.get("official_queries_extra"):  queries.extend(item["official_queries_extra"])
+
+        for q in queries:
+            print(f"   [{slot}] 🔎 Buscando arte oficial: {q}")
+            img_url = buscar_arte_oficial_por_query(q)
+            if not img_url:
+                continue
+            raw_candidate = OUT_RAW / f"img_raw_{slot:02}.jpg"
+            if baixar_imagem(img_url, raw_candidate):
+                print(f"   [{slot}] ✅ Oficial encontrada: {img_url}")
+                return raw_candidate
+            print(f"   [{slot}] ⚠️ Falha ao baixar, tentando próxima…")
+        print(f"   [{slot}] ⚠️ Não achei oficial — vou gerar por IA (fallback).")
+
+    # 2) Se não oficial (ou oficial falhou): gerar IA
+    print(f"   [{slot}] 🤖 Gerando IA…")
+    try:
+        return generate_ai_image(prompt_final, slot, tries=3, variant=variant)
+    except Exception as e:
+        print(f"❌ Erro ao gerar imagem (fala {i}): {e}")
+        return None
+
+def obter_lote_ia(prompt_final: str, slots: List[int], variants: List[int]) -> Dict[int, Optional[Path]]:
+    """Prompts idênticos: uma requisição com n=len(slots); o que faltar cai para chamadas individuais."""
+    print(f"   [{','.join(map(str, slots))}] 🤖 Gerando IA em lote (n={len(slots)})…")
+    got: Dict[int, Optional[Path]] = {}
+    try:
+        got.update(generate_ai_images(prompt_final, slots, tries=3, variants=variants))
+    except Exception as e:
+        print(f"   ⚠️ Lote falhou ({e}) — gerando individualmente.")
+    for slot, v in zip(slots, variants):
+        if slot not in got:
+            try:
+                got[slot] = generate_ai_image(prompt_final, slot, tries=3, variant=v)
+            except Exception as e:
+                print(f"❌ Erro ao gerar imagem (slot {slot}): {e}")
+                got[slot] = None
+    return got
+
 def main():
+    global USE_API_CACHE
+    ap = argparse.ArgumentParser(description="Gera/busca as imagens das falas")
+    ap.add_argument("--no-cache", action="store_true", help="Ignora os caches (gerações em assets/.api_cache, og:image em assets/.og_cache)")
+    args = ap.parse_args()
+    USE_API_CACHE = not args.no_cache
+
     falas = load_json(DIALOGO_JSON_PATH, [])
     if not falas:
         print("❌ 'output/dialogo_estruturado.json' não encontrado ou vazio.")
@@ -259,9 +556,9 @@ def main():
     }
 
     print(f"🔎 Falas: {len(falas)} | Itens planejados: {len(itens_por_linha)}")
-    manifest = {"itens": []}
-    contador = 1
 
+    # monta as tarefas primeiro (ordem das falas); a rede roda em paralelo depois
+    tarefas: List[Tuple[int, Dict[str, Any], Dict[str, Any], str, str]] = []
     for i, fala in enumerate(falas):
         item = itens_por_linha.get(i)
         if not item:
@@ -274,66 +571,123 @@ def main():
 
         # prompt final (para fallback IA)
         prompt_final = f"{style_prefix}. {plano_prompt}. {choose_style_tail(plano_prompt, allow_logo)}"
-        print(f"\n🖼️ [{contador}] Fala #{i} ({tipo or 'ai'})")
+        print(f"🖼️ [{len(tarefas) + 1}] Fala #{i} ({tipo or 'ai'})")
+        tarefas.append((i, fala, item, tipo, prompt_final))
 
-        raw_path: Optional[Path] = None
-
-        # 1) Se oficial: tenta baixar uma arte oficial via queries
-        if tipo == "official":
-            queries = []
-            if item.get("official_query"):          queries.append(item["official_query"])
-            if item.get("official_queries_extra"):  queries.extend(item["official_queries_extra"])
+    contador = 1
 
-            got = False
-            for q in queries:
-                print(f"   🔎 Buscando arte oficial: {q}")
-                img_url = buscar_arte_oficial_por_query(q)
-                if not img_url:
+    # retomada: slots que ficaram prontos numa execução interrompida (mesma fala, mesmo
+    # prompt, imagem bruta ainda no disco) não voltam à rede/API, só são padronizados de novo
+    retomados: Dict[int, Dict[str, Any]] = {}
+    for ln in _ler_parcial():
+        slot = ln.get("slot")
+        if not isinstance(slot, int) or not (1 <= slot <= len(tarefas)):
+            continue
+        i, _, _, _, prompt_final = tarefas[slot - 1]
+        if ln.get("fala_index") == i and ln.get("prompt_usado") == prompt_final \
+                and ln.get("arquivo_raw") and Path(ln["arquivo_raw"]).exists():
+            retomados[slot] = ln
+    if retomados:
+        print(f"♻️ Retomando {len(retomados)} imagem(ns) já prontas de {MANIFEST_PARCIAL}")
+
+    # sidecar JSONL: cada imagem padronizada é registrada na hora; se o processo cair
+    # no meio, o que já ficou pronto está listado ali. O manifest final sai dele no fim.
+    run_id = f"{os.getpid()}-{time.time_ns()}"
+    parcial = MANIFEST_PARCIAL.open("wb")
+    for ln in retomados.values():
+        parcial.write(_json_line(ln))  # continua valendo para retomar se cair de novo
+    parcial.flush()
+    parcial_lock = threading.Lock()
+    def registrar(fut: Future, entry: Dict[str, Any]):
+        if fut.exception() is None:
+            with parcial_lock:
+                parcial.write(_json_line({**entry, "tipo": fut.result(), "run": run_id}))
+                parcial.flush()
+
+    print(f"\n🚀 Obtendo {len(tarefas)} imagem(ns), workers={IMG_CONCURRENCY}…")
+    with parcial, ThreadPoolExecutor(max_workers=IMG_CONCURRENCY) as ex, \
+         ThreadPoolExecutor(max_workers=PAD_WORKERS) as pad_ex:
+        # IA com prompt idêntico vai em lote (n≤10); oficial e prompts únicos seguem um a um
+        futs: Dict[int, Future] = {}
+        grupos: Dict[str, List[int]] = {}
+        for slot, (i, fala, item, tipo, prompt_final) in enumerate(tarefas, 1):
+            if slot in retomados:
+                futs[slot] = Future()
+                futs[slot].set_result(Path(retomados[slot]["arquivo_raw"]))
+            if tipo == "official":
+                if slot not in retomados:
+                    futs[slot] = ex.submit(obter_imagem_raw, slot, i, item, tipo, prompt_final)
+            else:
+                # retomados entram no grupo também: a variante de cada slot é a posição no grupo
+                grupos.setdefault(prompt_final, []).append(slot)
+        for prompt_final, slots in grupos.items():
+            for k in range(0, len(slots), IMG_BATCH_MAX):
+                pend = [(slot, v) for v, slot in enumerate(slots[k:k + IMG_BATCH_MAX], k) if slot not in retomados]
+                if not pend:
                     continue
-                raw_candidate = OUT_RAW / f"img_raw_{contador:02}.jpg"
-                if baixar_imagem(img_url, raw_candidate):
-                    raw_path = raw_candidate
-                    got = True
-                    print(f"   ✅ Oficial encontrada: {img_url}")
-                    break
+                if len(pend) == 1:
+                    slot, v = pend[0]
+                    i, _, item, tipo, _ = tarefas[slot - 1]
+                    # lote de 1 (sobra ou retomada parcial): variante v, senão repete a chave de cache do 1º slot
+                    futs[slot] = ex.submit(obter_imagem_raw, slot, i, item, tipo, prompt_final, v)
                 else:
-                    print("   ⚠️ Falha ao baixar, tentando próxima…")
-            if not got:
-                print("   ⚠️ Não achei oficial — vou gerar por IA (fallback).")
+                    lote = [slot for slot, _ in pend]
+                    fut = ex.submit(obter_lote_ia, prompt_final, lote, [v for _, v in pend])
+                    for slot in lote:
+                        futs[slot] = fut
+
+        pad_futs: List[Tuple[Future, Dict[str, Any]]] = []
+        # consome na ordem das falas: numeração final estável; a padronização (PIL)
+        # vai para um pool de CPU próprio e não ocupa slots das requisições em voo
+        for slot, (i, fala, item, tipo, prompt_final) in enumerate(tarefas, 1):
+            res = futs[slot].result()
+            raw_path = res.get(slot) if isinstance(res, dict) else res
+            if raw_path is None:
+                continue
 
-        # 2) Se não oficial (ou oficial falhou): gerar IA
-        if raw_path is None:
-            print(f"   🤖 Gerando IA…")
+            # padroniza/copia
+            final_path = OUT_FINAL / f"img_{contador:02}.png"
+            video_path = OUT_FOR_VIDEO / f"imagem_{contador:02}.png"
+            pad_fut = pad_ex.submit(padronizar_ou_gerar, raw_path, final_path, video_path, slot, tipo, prompt_final)
+
+            entry = {
+                "idx_global": contador,
+                "fala_index": i,
+                "personagem": fala.get("personagem"),
+                "fala": fala.get("fala"),
+                "tipo": tipo or "ai",
+                "prompt_usado": prompt_final,
+                "arquivo_final": str(final_path),
+                "arquivo_video": str(video_path),
+                "official_query": item.get("official_query"),
+            }
+            pad_futs.append((pad_fut, entry))
+            pad_fut.add_done_callback(
+                lambda f, e=entry, slot=slot, raw=raw_path: registrar(f, {**e, "slot": slot, "arquivo_raw": str(raw)}))
+            contador += 1
+        for f, it in pad_futs:
             try:
-                raw_path = generate_ai_image(prompt_final, contador, tries=3)
+                f.result()
             except Exception as e:
-                print(f"❌ Erro ao gerar imagem (fala {i}): {e}")
-                continue
-
-        # padroniza/copia
-        final_path = OUT_FINAL / f"img_{contador:02}.png"
-        padronizar_imagem(raw_path, final_path, SIZE)
-
-        video_path = OUT_FOR_VIDEO / f"imagem_{contador:02}.png"
-        padronizar_imagem(raw_path, video_path, SIZE)
-
-        print(f"✅ Salvo: {final_path} | Copiado p/ vídeo: {video_path}")
-
-        manifest["itens"].append({
-            "idx_global": contador,
-            "fala_index": i,
-            "personagem": fala.get("personagem"),
-            "fala": fala.get("fala"),
-            "tipo": tipo or "ai",
-            "prompt_usado": prompt_final,
-            "arquivo_final": str(final_path),
-            "arquivo_video": str(video_path),
-            "official_query": item.get("official_query"),
-        })
-        contador += 1
-
-    with MANIFEST_PATH.open("w", encoding="utf-8") as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+                print(f"❌ Falha ao padronizar (fala {it['fala_index']}): {e}")
+
+    # consolida: só o que esta execução registrou (padronização ok), na ordem das falas
+    itens = [ln for ln in _ler_parcial() if ln.get("run") == run_id]
+    for it in itens:
+        for k in ("run", "slot", "arquivo_raw"):
+            it.pop(k, None)
+    itens.sort(key=lambda it: it["idx_global"])
+    manifest = {"itens": itens}
+
+    for it in manifest["itens"]:
+        print(f"✅ Salvo: {it['arquivo_final']} | Copiado p/ vídeo: {it['arquivo_video']}")
+
+    if orjson is not None:
+        MANIFEST_PATH.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with MANIFEST_PATH.open("w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+    MANIFEST_PARCIAL.unlink(missing_ok=True)  # consolidado no JSON final
     print(f"\n🧾 Manifest salvo em: {MANIFEST_PATH}")
     print("🏁 Fim da geração de imagens.")
 
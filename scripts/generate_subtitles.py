@@ -2,10 +2,9 @@ import json
 from pathlib import Path
 
 def ms_para_srt_timestamp(ms):
-    horas = ms // 3600000
-    minutos = (ms % 3600000) // 60000
-    segundos = (ms % 60000) // 1000
-    milissegundos = ms % 1000
+    segundos, milissegundos = divmod(ms, 1000)
+    minutos, segundos = divmod(segundos, 60)
+    horas, minutos = divmod(minutos, 60)
     return f"{horas:02}:{minutos:02}:{segundos:02},{milissegundos:03}"
 
 def gerar_legendas_com_timestamps(json_dir, output_path):
@@ -40,10 +39,7 @@ def gerar_legendas_com_timestamps(json_dir, output_path):
 
         texto = " ".join([p['word'] for p in palavras])
 
-        linhas_srt.append(f"{index}")
-        linhas_srt.append(f"{inicio_str} --> {fim_str}")
-        linhas_srt.append(texto)
-        linhas_srt.append("")
+        linhas_srt.extend((f"{index}", f"{inicio_str} --> {fim_str}", texto, ""))
 
         index += 1
 
@@ -1,8 +1,12 @@
 # file: replicate_pipeline.py
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List, Optional, Tuple
 from uuid import uuid4
 
+import httpx
 import replicate
 import requests
 from dotenv import load_dotenv
@@ -21,6 +25,36 @@ INTERPOLATE = os.environ["REPLICATE_INTERPOLATION_SLUG"]
 DEFAULT_FPS = int(os.getenv("DEFAULT_FPS", "30"))
 DEFAULT_RES = int(os.getenv("DEFAULT_RESOLUTION", "768"))
 
+RETRY_TRIES = 3
+
+def _transitorio(e: Exception) -> bool:
+    """Timeout/conexão, 429 ou 5xx valem nova tentativa; erro do modelo ou 4xx não."""
+    if isinstance(e, (httpx.TimeoutException, httpx.NetworkError,
+                      requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    status = getattr(e, "status", None) or getattr(getattr(e, "response", None), "status_code", None)
+    return status == 429 or (isinstance(status, int) and status >= 500)
+
+def _retry(fn, tries: int = RETRY_TRIES, base: float = 2.0, cap: float = 30.0):
+    """Chama fn() com backoff exponencial (2s, 4s, … até 30s) em falhas transitórias."""
+    for attempt in range(1, tries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == tries or not _transitorio(e):
+                raise
+            wait = min(cap, base * 2 ** (attempt - 1))
+            print(f"   ⚠️ {type(e).__name__}: {e} — nova tentativa em {wait:.0f}s ({attempt}/{tries})")
+            time.sleep(wait)
+
+def _baixar(url: str, dst: Path) -> None:
+    # streaming em blocos de 1 MiB: o MP4 (20-100 MB) não fica inteiro na memória
+    with requests.get(url, timeout=60, stream=True) as resp:
+        resp.raise_for_status()
+        with dst.open("wb") as f:  # "wb": uma nova tentativa reescreve do zero
+            for chunk in resp.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+
 def _save_output(output, suffix) -> Path:
     """
     Replicate hoje pode retornar:
@@ -39,36 +73,39 @@ def _save_output(output, suffix) -> Path:
         # Assume string (URL)
         if not isinstance(output, str):
             raise TypeError(f"Tipo de saída inesperado: {type(output)}")
-        resp = requests.get(output, timeout=60)
-        resp.raise_for_status()
-        out_path.write_bytes(resp.content)
+        _retry(lambda: _baixar(output, out_path))
         return out_path
 
 def align_face(image_path: str) -> Path:
     """Alinha/recorta a face para padronizar antes da animação."""
-    with open(image_path, "rb") as f:
-        output = client.run(FACE_ALIGN, input={"image": f})
+    def chamada():
+        # reabre a cada tentativa: o upload anterior já consumiu o arquivo
+        with open(image_path, "rb") as f:
+            return client.run(FACE_ALIGN, input={"image": f})
+    output = _retry(chamada)
     # face-align-cog retorna um único arquivo (imagem)
     return _save_output(output, suffix=".png")
 
 def animate_memo(image_path: str, audio_path: str,
                  fps: int = DEFAULT_FPS, resolution: int = DEFAULT_RES) -> Path:
     """Gera o vídeo do personagem falando (MEMO)."""
-    with open(image_path, "rb") as img, open(audio_path, "rb") as aud:
-        output = client.run(
-            TALKING_HEAD,
-            input={
-                "image": img,                 # png/jpg
-                "audio": aud,                 # wav/mp3
-                "fps": fps,                   # 1..60
-                "resolution": resolution,     # 64..2048 (quadrado)
-                # parâmetros úteis (use sob demanda):
-                # "inference_steps": 20,
-                # "cfg_scale": 3.5,
-                # "max_audio_seconds": 60,
-                # "seed": 0
-            },
-        )
+    def chamada():
+        with open(image_path, "rb") as img, open(audio_path, "rb") as aud:
+            return client.run(
+                TALKING_HEAD,
+                input={
+                    "image": img,                 # png/jpg
+                    "audio": aud,                 # wav/mp3
+                    "fps": fps,                   # 1..60
+                    "resolution": resolution,     # 64..2048 (quadrado)
+                    # parâmetros úteis (use sob demanda):
+                    # "inference_steps": 20,
+                    # "cfg_scale": 3.5,
+                    # "max_audio_seconds": 60,
+                    # "seed": 0
+                },
+            )
+    output = _retry(chamada)
     # MEMO retorna um único mp4
     return _save_output(output, suffix=".mp4")
 
@@ -80,15 +117,17 @@ def film_interpolate(video_path: str,
     - num_interpolation_steps=1 => dobra o número de quadros (aprox.)
     - playback_frames_per_second ajusta o FPS final do arquivo
     """
-    with open(video_path, "rb") as mp4:
-        output = client.run(
-            INTERPOLATE,
-            input={
-                "mp4": mp4,
-                "playback_frames_per_second": target_fps,  # 1..60
-                "num_interpolation_steps": steps,          # 1..50
-            },
-        )
+    def chamada():
+        with open(video_path, "rb") as mp4:
+            return client.run(
+                INTERPOLATE,
+                input={
+                    "mp4": mp4,
+                    "playback_frames_per_second": target_fps,  # 1..60
+                    "num_interpolation_steps": steps,          # 1..50
+                },
+            )
+    output = _retry(chamada)
     return _save_output(output, suffix=".mp4")
 
 def run_pipeline(
@@ -118,6 +157,27 @@ def run_pipeline(
     print("   vídeo final:", refined)
     return refined
 
+def run_many(
+    pairs: List[Tuple[str, str]],
+    max_concurrent: int = 4,
+    **kwargs,
+) -> List[Optional[str]]:
+    """
+    Vários pares (imagem, áudio) ao mesmo tempo: cada pipeline continua
+    align → MEMO → FILM em série, mas os pares disputam só o limite de
+    concorrência da conta no Replicate (as threads passam o tempo esperando a API).
+    Retorna os vídeos finais na ordem dos pares (None onde falhou).
+    """
+    def um(par: Tuple[str, str]) -> Optional[str]:
+        try:
+            return run_pipeline(par[0], par[1], **kwargs)
+        except Exception as e:
+            print(f"❌ Falhou ({par[0]}, {par[1]}): {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrent)) as ex:
+        return list(ex.map(um, pairs))
+
 if __name__ == "__main__":
     # Exemplo rápido:
     # python replicate_pipeline.py
@@ -1,13 +1,59 @@
 import requests
 import os
 import json
+import time
+import hashlib
 from dotenv import load_dotenv
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # 🔐 Carrega as variáveis do .env
 load_dotenv()
 API_KEY = os.getenv("NEWSAPI_KEY")
 
+# 🔁 Sessão única: keep-alive entre chamadas + backoff automático em 5xx
+# (429 fica de fora: o rate limit da NewsAPI dura horas; raise_on_status=False devolve a
+#  última resposta de erro para o tratamento de JSON abaixo em vez de levantar RetryError)
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504],
+                      raise_on_status=False),
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+# 🗄️ Cache da resposta da NewsAPI: TTL local (NEWSAPI_TTL) + GET condicional
+NEWSAPI_CACHE_DIR = Path("assets/.http_cache")  # fora de output/: o backup do pipeline move tudo de lá
+NEWSAPI_TTL = 600  # segundos sem nem tocar na rede
+
+def _cache_path(params):
+    chave = json.dumps({k: v for k, v in params.items() if k != "apiKey"}, sort_keys=True)
+    return NEWSAPI_CACHE_DIR / f"newsapi_{hashlib.sha1(chave.encode('utf-8')).hexdigest()}.json"
+
+def _cache_load(path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def _cache_store(path, response, data):
+    entry = {
+        "etag": response.headers.get("ETag") or "",
+        "last_modified": response.headers.get("Last-Modified") or "",
+        "fetched": time.time(),
+        "body": data,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
 # 🌐 Google News via NewsAPI
 def get_google_news(api_key, quantidade=5):
     url = "https://newsapi.org/v2/top-headlines"
@@ -18,14 +64,35 @@ def get_google_news(api_key, quantidade=5):
         "apiKey": api_key
     }
 
-    response = requests.get(url, params=params)
-    print("🔍 Status code:", response.status_code)
+    cache_path = _cache_path(params)
+    cache = _cache_load(cache_path)
+    if cache.get("body") and time.time() - float(cache.get("fetched") or 0) < NEWSAPI_TTL:
+        print(f"♻️ Usando resposta da NewsAPI em cache (menos de {NEWSAPI_TTL // 60} min).")
+        data = cache["body"]
+    else:
+        headers = {}
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+        try:
+            response = _SESSION.get(url, params=params, headers=headers, timeout=10)
+        except requests.RequestException as e:
+            print("❌ Falha ao acessar a NewsAPI:", e)
+            return []
+        print("🔍 Status code:", response.status_code)
 
-    try:
-        data = response.json()
-    except ValueError:
-        print("❌ Erro ao interpretar JSON da resposta.")
-        return []
+        if response.status_code == 304 and cache.get("body"):
+            data = cache["body"]  # não mudou: corpo vem do cache
+            _cache_store(cache_path, response, data)
+        else:
+            try:
+                data = response.json()
+            except ValueError:
+                print("❌ Erro ao interpretar JSON da resposta.")
+                return []
+            if response.ok and "articles" in data:
+                _cache_store(cache_path, response, data)
 
     if "articles" not in data:
         print("❌ Resposta inválida da NewsAPI:", data)
@@ -4,85 +4,116 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import ElementNotInteractableException
-import os, time, re
+from selenium.common.exceptions import ElementNotInteractableException, TimeoutException
+from contextlib import contextmanager
+from typing import List, Tuple
+import os, re
+
+_RE_EMOJI    = re.compile(r'[^\u0000-\uFFFF]')  # tudo fora do BMP (emojis)
+_RE_V_PREFIX = re.compile(r'^[vV]\s*')
 
 def remover_emojis(texto):
-    return re.sub(r'[^\u0000-\uFFFF]', '', texto)
+    return _RE_EMOJI.sub('', texto)
 
 def limpar_legenda(texto):
     texto = texto.strip()
-    texto = re.sub(r'^[vV]\s*', '', texto)  # remove 'v ' ou 'V' no início
+    texto = _RE_V_PREFIX.sub('', texto)  # remove 'v ' ou 'V' no início
     texto = texto.replace("＃", "#").replace("﹟", "#")  # normaliza #
     texto = remover_emojis(texto)
     return texto
 
-def postar_no_tiktok():
-    VIDEO_PATH = os.path.abspath("output/video_final.mp4")
-    CAPTION_PATH = os.path.abspath("output/legenda_tiktok.txt")
-
-    with open(CAPTION_PATH, "r", encoding="utf-8") as f:
-        legenda = limpar_legenda(f.read())
+UPLOAD_URL = "https://www.tiktok.com/upload"
+# aviso/modal que o TikTok mostra depois de publicar (PT e EN)
+PUBLICADO_XPATH = (
+    '//*[contains(text(), "foi publicado") or contains(text(), "Vídeo publicado")'
+    ' or contains(text(), "sendo carregado") or contains(text(), "Gerenciar publicações")'
+    ' or contains(text(), "has been posted") or contains(text(), "being uploaded")'
+    ' or contains(text(), "Manage your posts")]'
+)
+
+def _upload_one(driver, video_path: str, legenda: str):
+    print("🌐 Acessando TikTok Upload...")
+    driver.get(UPLOAD_URL)
+
+    print("⏳ Aguardando campo de upload...")
+    input_upload = WebDriverWait(driver, 30).until(
+        EC.presence_of_element_located((By.XPATH, '//input[@type="file"]'))
+    )
+
+    print("📤 Enviando vídeo...")
+    input_upload.send_keys(video_path)
+
+    print("⏳ Aguardando confirmação de 'Enviado'...")
+    WebDriverWait(driver, 120).until(
+        EC.presence_of_element_located((By.XPATH, '//*[contains(text(), "Enviado")]'))
+    )
+
+    print("⏳ Localizando campo editável de legenda...")
+    editable_div = WebDriverWait(driver, 60).until(
+        EC.element_to_be_clickable((By.XPATH, '//div[@contenteditable="true"]'))
+    )
+
+    print("🧹 Limpando legenda anterior...")
+    editable_div.click()
+    editable_div.send_keys(Keys.COMMAND + "a")
+    editable_div.send_keys(Keys.DELETE)
+
+    print("📝 Escrevendo nova legenda...")
+    # texto inteiro numa chamada só; insertText passa pelo editor (React) como digitação
+    # e o evento 'input' garante que o estado interno seja atualizado
+    texto = " ".join(legenda.split()) + " "
+    driver.execute_script(
+        """
+        const el = arguments[0], txt = arguments[1];
+        el.focus();
+        document.execCommand('insertText', false, txt);
+        el.dispatchEvent(new InputEvent('input', {bubbles: true, data: txt, inputType: 'insertText'}));
+        """,
+        editable_div, texto,
+    )
+
+    print("🚀 Localizando botão 'Publicar'...")
+    botao_postar = WebDriverWait(driver, 60).until(
+        EC.element_to_be_clickable((By.XPATH, '//button[.//div[text()="Publicar"]]'))
+    )
+
+    print("✅ Clicando no botão...")
+    botao_postar.click()
+
+    # em vez de um sleep fixo: espera a confirmação de publicação
+    try:
+        WebDriverWait(driver, 60).until(EC.presence_of_element_located((By.XPATH, PUBLICADO_XPATH)))
+        print("🎉 Vídeo publicado com legenda correta!")
+    except TimeoutException:
+        # o clique já foi: a publicação pode ter ido mesmo sem o aviso aparecer
+        print("⚠️ Confirmação de publicação não apareceu em 60s — confira no perfil.")
 
+@contextmanager
+def tiktok_session():
+    """Um único driver (anexado ao Chrome já logado na porta 9222) para vários uploads."""
     options = Options()
     options.debugger_address = "127.0.0.1:9222"
     driver = webdriver.Chrome(options=options)
-
     try:
-        print("🌐 Acessando TikTok Upload...")
-        driver.get("https://www.tiktok.com/upload")
-
-        print("⏳ Aguardando campo de upload...")
-        input_upload = WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.XPATH, '//input[@type="file"]'))
-        )
-
-        print("📤 Enviando vídeo...")
-        input_upload.send_keys(VIDEO_PATH)
-
-        print("⏳ Aguardando confirmação de 'Enviado'...")
-        WebDriverWait(driver, 120).until(
-            EC.presence_of_element_located((By.XPATH, '//*[contains(text(), "Enviado")]'))
-        )
-
-        print("⏳ Localizando campo editável de legenda...")
-        editable_div = WebDriverWait(driver, 60).until(
-            EC.element_to_be_clickable((By.XPATH, '//div[@contenteditable="true"]'))
-        )
-
-        print("🧹 Limpando legenda anterior...")
-        editable_div.click()
-        editable_div.send_keys(Keys.COMMAND + "a")
-        editable_div.send_keys(Keys.DELETE)
-        time.sleep(1)
-
-        print("📝 Escrevendo nova legenda...")
-        for palavra in legenda.split():
-            editable_div.send_keys(palavra)
-            if palavra.startswith("#"):
-                editable_div.send_keys(" ")
-            else:
-                editable_div.send_keys(" ")
-            time.sleep(0.05)
-
-        time.sleep(2)
-
-        print("🚀 Localizando botão 'Publicar'...")
-        botao_postar = WebDriverWait(driver, 60).until(
-            EC.element_to_be_clickable((By.XPATH, '//button[.//div[text()="Publicar"]]'))
-        )
-
-        print("✅ Clicando no botão...")
-        botao_postar.click()
-
-        print("🎉 Vídeo publicado com legenda correta!")
-
-    except ElementNotInteractableException:
-        print("⚠️ Não foi possível interagir com o campo de legenda.")
-    except Exception as e:
-        print(f"❌ Erro: {e}")
+        yield driver
     finally:
-        time.sleep(10)
         driver.quit()
+
+def postar_varios(jobs: List[Tuple[str, str]]):
+    """jobs: [(caminho do vídeo, caminho da legenda)] publicados em sequência na mesma sessão."""
+    with tiktok_session() as driver:
+        for video, caption in jobs:
+            with open(caption, "r", encoding="utf-8") as f:
+                legenda = limpar_legenda(f.read())
+            try:
+                _upload_one(driver, os.path.abspath(video), legenda)
+            except ElementNotInteractableException:
+                print("⚠️ Não foi possível interagir com o campo de legenda.")
+            except Exception as e:
+                print(f"❌ Erro: {e}")
+
+def postar_no_tiktok():
+    postar_varios([("output/video_final.mp4", "output/legenda_tiktok.txt")])
+
 if __name__ == "__main__":
     postar_no_tiktok()
@@ -20,46 +20,56 @@ Exemplos:
 """
 
 from __future__ import annotations
-import argparse, json, os, re, sys, math, statistics
+import argparse, hashlib, json, os, pickle, re, sys
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple, Optional
 
+import numpy as np
+try:
+    import orjson  # parse/serialização em Rust, direto de/para bytes
+except Exception:
+    orjson = None
+try:
+    import ijson  # parse incremental (backend yajl2_c quando disponível)
+except Exception:
+    ijson = None
+
 # ──────────────────────────────────────────────────────────────────────────────
 # utils
 # ──────────────────────────────────────────────────────────────────────────────
 
+# tabela única (passada em C) no lugar de seis re.sub; roda depois do lower()
+_ACCENT_TABLE = str.maketrans({
+    **dict.fromkeys("áàâãä", "a"),
+    **dict.fromkeys("éèêë", "e"),
+    **dict.fromkeys("íìîï", "i"),
+    **dict.fromkeys("óòôõö", "o"),
+    **dict.fromkeys("úùûü", "u"),
+    "ç": "c",
+})
+_RE_NONALNUM = re.compile(r"[^a-z0-9]+")
+_RE_WS = re.compile(r"\s+")
+
 def strip_accents(s: str) -> str:
-    s = s.lower()
-    s = re.sub(r"[áàâãä]", "a", s)
-    s = re.sub(r"[éèêë]", "e", s)
-    s = re.sub(r"[íìîï]", "i", s)
-    s = re.sub(r"[óòôõö]", "o", s)
-    s = re.sub(r"[úùûü]", "u", s)
-    s = re.sub(r"ç", "c", s)
-    return s
+    return s.lower().translate(_ACCENT_TABLE)
 
+@lru_cache(maxsize=65536)
 def slug_spaces(s: str) -> str:
-    s = strip_accents(s)
-    s = re.sub(r"[^a-z0-9]+", " ", s).strip()
-    s = re.sub(r"\s+", " ", s)
-    return s
-
-def logistic(x: float) -> float:
-    return 1.0 / (1.0 + math.exp(-x))
-
-def zscore(vals: List[float]) -> List[float]:
-    if not vals: return []
-    if all(v == vals[0] for v in vals): return [0.0]*len(vals)
-    m = statistics.mean(vals)
-    sd = statistics.pstdev(vals) or 1e-9
-    return [(v - m)/sd for v in vals]
-
-def safe_get(d: Dict, path: List[str], default=None):
-    cur = d
-    for k in path:
-        if not isinstance(cur, dict) or k not in cur:
-            return default
-        cur = cur[k]
-    return cur
+    # cada trecho não-alfanumérico (espaços inclusos) vira um único espaço: não sobra \s+ para colapsar
+    return _RE_NONALNUM.sub(" ", strip_accents(s)).strip()
+
+def logistic(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+def zscore(vals: np.ndarray) -> np.ndarray:
+    vals = np.asarray(vals, dtype=np.float64)
+    if vals.size == 0 or np.all(vals == vals[0]): return np.zeros_like(vals)
+    return (vals - vals.mean()) / (vals.std() or 1e-9)
+
+def _sig(d: Dict, k: str, dflt: float = 0.0) -> float:
+    """d["signals"][k] como float; signals ausente/não-dict ou valor vazio → dflt"""
+    s = d.get("signals")
+    return float((s.get(k, dflt) if isinstance(s, dict) else dflt) or dflt)
 
 def uniq(seq):
     seen=set(); out=[]
@@ -72,20 +82,58 @@ def uniq(seq):
 # core
 # ──────────────────────────────────────────────────────────────────────────────
 
-def load_json(path: str) -> List[Dict[str, Any]]:
+LOAD_CACHE_DIR = os.path.join("assets", ".rank_cache")  # pickle das entradas por (mtime_ns, size, min_score); fora de output/
+
+def _score_ok(it: Any, min_score: float) -> bool:
+    return isinstance(it, dict) and float(it.get("score", 0.0)) >= min_score
+
+def _parse_json(path: str, min_score: float) -> List[Dict[str, Any]]:
+    if min_score > 0 and ijson is not None:
+        # filtro durante o parse: itens descartados nunca viram lista inteira na memória
+        with open(path, "rb") as fb:
+            return [it for it in ijson.items(fb, "item", use_float=True) if _score_ok(it, min_score)]
+    if orjson is not None:
+        with open(path, "rb") as fb:
+            data = orjson.loads(fb.read())
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    if isinstance(data, list):
+        return [it for it in data if _score_ok(it, min_score)]
+    return []
+
+def _load_cache_path(path: str) -> str:
+    return os.path.join(LOAD_CACHE_DIR, hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:16] + ".pkl")
+
+def load_json(path: str, min_score: float = 0.0) -> List[Dict[str, Any]]:
+    """lista do arquivo, já sem os itens com score < min_score (cache em pickle enquanto o arquivo não mudar)"""
     if not os.path.exists(path):
         print(f"[ERROR] arquivo não encontrado: {path}", file=sys.stderr)
         return []
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size, min_score)
+    cache = _load_cache_path(path)
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, list):
-                return data
-            else:
-                return []
+        with open(cache, "rb") as fb:
+            cached_key, cached = pickle.load(fb)
+        if cached_key == key:
+            return cached
+    except Exception:
+        pass  # sem cache / cache corrompido: parseia de novo
+    try:
+        data = _parse_json(path, min_score)
     except Exception as e:
         print(f"[ERROR] falha ao ler {path}: {e}", file=sys.stderr)
         return []
+    try:
+        os.makedirs(LOAD_CACHE_DIR, exist_ok=True)
+        tmp = f"{cache}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fb:
+            pickle.dump((key, data), fb, protocol=5)
+        os.replace(tmp, cache)
+    except Exception:
+        pass
+    return data
 
 def build_keys(item: Dict[str, Any]) -> List[str]:
     """gera chaves de matching a partir de topic, aliases e keywords"""
@@ -98,87 +146,133 @@ def build_keys(item: Dict[str, Any]) -> List[str]:
         keys.append(slug_spaces(k))
     return uniq([k for k in keys if k])
 
-def fuzzy_best(query: str, candidates: List[str]) -> Tuple[int, float]:
+def presort(s: str) -> str:
+    """tokens ordenados: ratio(presort(a), presort(b)) == token_sort_ratio(a, b) para chaves já slugificadas"""
+    return " ".join(sorted(s.split()))
+
+def score_matrix(queries: List[str], candidates: List[str], threshold: int,
+                 presorted: bool = False) -> np.ndarray:
     """
-    retorna (idx, score 0..100) do melhor candidato (ou (-1,0))
+    matriz len(queries) × len(candidates) de token_sort_ratio (0..100) em float32, toda em C e
+    multi-thread; abaixo do threshold vira 0 (nunca casaria mesmo).
+    presorted=True: as chaves já passaram por presort (merge faz isso uma vez para todos os blocos)
     """
     try:
         from rapidfuzz import process, fuzz
-        res = process.extractOne(query, candidates, scorer=fuzz.token_sort_ratio)
-        if res is None: return -1, 0.0
-        cand, score, idx = res
-        return idx, float(score)
-    except Exception:
+        # ordena os tokens uma vez por string (não a cada comparação) e usa o InDel puro
+        if not presorted:
+            queries, candidates = [presort(q) for q in queries], [presort(c) for c in candidates]
+        return process.cdist(queries, candidates, scorer=fuzz.ratio, processor=None,
+                             score_cutoff=threshold, dtype=np.float32, workers=-1)
+    except ImportError:
         # fallback: igualdade exata
-        try:
-            idx = candidates.index(query)
-            return idx, 100.0
-        except ValueError:
-            return -1, 0.0
+        pos: Dict[str, List[int]] = {}
+        for j, c in enumerate(candidates):
+            pos.setdefault(c, []).append(j)
+        m = np.zeros((len(queries), len(candidates)), dtype=np.float32)
+        for i, q in enumerate(queries):
+            m[i, pos.get(q, [])] = 100.0
+        return m
+
+def _owners(keys: List[List[str]]) -> Tuple[List[str], np.ndarray]:
+    """SoA: chaves numa lista plana + owner[k] = índice do item dono da k-ésima chave (não-decrescente)"""
+    flat = [k for ks in keys for k in ks]
+    owner = np.fromiter((i for i, ks in enumerate(keys) for _ in ks), dtype=np.int32, count=len(flat))
+    return flat, owner
+
+def _group_max(m: np.ndarray, owner: np.ndarray, n: int, axis: int) -> np.ndarray:
+    """colapsa as chaves de cada item no máximo ao longo de `axis` (itens sem chave ficam com 0)"""
+    present = np.unique(owner)                   # reduceat não aceita grupo vazio: só os donos presentes
+    starts = np.searchsorted(owner, present)
+    red = np.maximum.reduceat(m, starts, axis=axis)
+    shape = list(m.shape); shape[axis] = n
+    out = np.zeros(shape, dtype=m.dtype)
+    if axis == 0:
+        out[present] = red
+    else:
+        out[:, present] = red
+    return out
+
+# chaves do YouTube por chamada do cdist: memória ~ MERGE_CHUNK_ROWS × chaves do alt (float32)
+MERGE_CHUNK_ROWS = 2048
 
 def merge(yt_items: List[Dict[str,Any]], alt_items: List[Dict[str,Any]], threshold: int) -> Dict[str, Any]:
-    # indexa ALT por múltiplas chaves
-    alt_index: List[Tuple[int, str]] = []
-    alt_keys_flat: List[str] = []
-    for i, it in enumerate(alt_items):
-        for k in build_keys(it):
-            alt_index.append((i, k))
-            alt_keys_flat.append(k)
-
-    used_alt = set()
-    pairs = []
-    only_yt = []
-    for y in yt_items:
-        y_keys = build_keys(y)
-        # prioriza melhor match entre todas as chaves do yt
-        best = (-1, 0.0, None)  # (alt_idx, score, key_used)
-        for yk in y_keys:
-            idx, score = fuzzy_best(yk, alt_keys_flat)
-            if score > best[1]:
-                best = (alt_index[idx][0] if idx>=0 else -1, score, yk)
-        if best[0] >= 0 and best[1] >= threshold and best[0] not in used_alt:
-            pairs.append((y, alt_items[best[0]], best[1]))
-            used_alt.add(best[0])
-        else:
-            only_yt.append(y)
-
-    only_alt = [it for i, it in enumerate(alt_items) if i not in used_alt]
+    # indexa YT e ALT por múltiplas chaves
+    yt_keys_flat, yt_owner = _owners([build_keys(y) for y in yt_items])
+    alt_keys_flat, alt_owner = _owners([build_keys(a) for a in alt_items])
+
+    # chaves do YouTube contra todas as do ALT em blocos de itens inteiros (≤ MERGE_CHUNK_ROWS chaves),
+    # cada bloco já reduzido para item × item: a matriz chave × chave nunca existe inteira
+    item_scores = None
+    if yt_keys_flat and alt_keys_flat:
+        yt_sorted = [presort(k) for k in yt_keys_flat]
+        alt_sorted = [presort(k) for k in alt_keys_flat]
+        n_yt = len(yt_items)
+        item_scores = np.zeros((n_yt, len(alt_items)), dtype=np.float32)
+        key_start = np.searchsorted(yt_owner, np.arange(n_yt + 1))  # chaves do item i: [key_start[i], key_start[i+1])
+        i0 = 0
+        while i0 < n_yt:
+            i1 = int(np.searchsorted(key_start, key_start[i0] + MERGE_CHUNK_ROWS, side="right")) - 1
+            i1 = min(n_yt, max(i0 + 1, i1))
+            k0, k1 = int(key_start[i0]), int(key_start[i1])
+            if k1 > k0:
+                scores = score_matrix(yt_sorted[k0:k1], alt_sorted, threshold, presorted=True)
+                scores = _group_max(scores, yt_owner[k0:k1] - i0, i1 - i0, axis=0)
+                item_scores[i0:i1] = _group_max(scores, alt_owner, len(alt_items), axis=1)
+            i0 = i1
+
+    # casamento guloso global: maiores scores primeiro, cada item de cada lado usado uma vez
+    match = np.full(len(yt_items), -1, dtype=np.int64)
+    match_score = np.zeros(len(yt_items))
+    used_alt = np.zeros(len(alt_items), dtype=bool)
+    if item_scores is not None:
+        flat = item_scores.ravel()
+        cand = np.flatnonzero((flat >= threshold) & (flat > 0))
+        cand = cand[np.argsort(-flat[cand], kind="stable")]  # empate: menor yt, depois menor alt
+        n_alt = len(alt_items)
+        left = min(len(yt_items), n_alt)
+        for f in cand.tolist():
+            yi, aj = divmod(f, n_alt)
+            if match[yi] < 0 and not used_alt[aj]:
+                match[yi] = aj; match_score[yi] = flat[f]
+                used_alt[aj] = True
+                left -= 1
+                if not left: break
+
+    pairs = [(y, alt_items[match[yi]], float(match_score[yi])) for yi, y in enumerate(yt_items) if match[yi] >= 0]
+    only_yt = [y for yi, y in enumerate(yt_items) if match[yi] < 0]
+    only_alt = [it for i, it in enumerate(alt_items) if not used_alt[i]]
 
     return {"pairs": pairs, "only_yt": only_yt, "only_alt": only_alt}
 
-def consensus_score(y: Dict[str,Any], a: Dict[str,Any]) -> float:
+def consensus_scores(pairs: List[Tuple[Dict[str,Any], Dict[str,Any], float]]) -> np.ndarray:
     """
-    score final 0..1. Dá mais peso ao YouTube (forte proxy de demanda) e complementa com Alt.
+    score final 0..1 de cada par. Dá mais peso ao YouTube (forte proxy de demanda) e complementa com Alt.
+    Os sinais auxiliares viram z-score entre todos os pares (o antigo zscore([x, 0]) intra-par
+    colapsava para o sinal de x e não diferenciava nada).
     """
-    y_s = float(safe_get(y, ["signals","_score"], 0.0) or 0.0)   # 0..1
-    a_s = float(safe_get(a, ["signals","_score"], 0.0) or 0.0)   # 0..1
+    def col(side: int, key: str, default: float) -> np.ndarray:
+        return np.array([_sig(p[side], key, default) for p in pairs])
 
-    # sinais auxiliares (normalizados já 0..100)
-    y_v = float(safe_get(y, ["signals","yt_view_velocity"], 0.0) or 0.0)   # 0..100
-    a_p = float(safe_get(a, ["signals","popularity"], 0.0) or 0.0)         # 0..100
-    a_src = float(safe_get(a, ["signals","src_count"], 1.0) or 1.0)
+    y_s = col(0, "_score", 0.0)               # 0..1
+    a_s = col(1, "_score", 0.0)               # 0..1
 
-    # normaliza auxiliares com zscore intra-par para suavizar escala
-    z_v = zscore([y_v, 0.0])[0]
-    z_p = zscore([a_p, 0.0])[0]
-    z_src = zscore([a_src, 0.0])[0]
+    # sinais auxiliares (normalizados já 0..100)
+    y_v = col(0, "yt_view_velocity", 0.0)     # 0..100
+    a_p = col(1, "popularity", 0.0)           # 0..100
+    a_src = col(1, "src_count", 1.0)
 
     # combinação linear e logística
-    lin = 0.60*y_s + 0.40*a_s + 0.15*z_v + 0.10*z_p + 0.05*z_src
-    return float(logistic(lin))
+    lin = 0.60*y_s + 0.40*a_s + 0.15*zscore(y_v) + 0.10*zscore(a_p) + 0.05*zscore(a_src)
+    return logistic(lin)
 
 def union_keywords(y: Dict[str,Any], a: Dict[str,Any]) -> List[str]:
-    ks = []
-    for arr in (y.get("keywords", []), a.get("keywords", [])):
-        for k in (arr or []):
-            k = slug_spaces(k)
-            if k and k not in ks: ks.append(k)
+    # dict.fromkeys = conjunto ordenado (dedupe sem o "not in" linear)
+    ks = dict.fromkeys(k for arr in (y.get("keywords"), a.get("keywords"))
+                       for k in map(slug_spaces, arr or []) if k)
     # forma hashtags curtas (até 20 chars)
-    tags = []
-    for k in ks:
-        tag = "#" + re.sub(r"\s+", "", k)[:20]
-        if tag not in tags: tags.append(tag)
-    return tags[:6]
+    tags = dict.fromkeys("#" + _RE_WS.sub("", k)[:20] for k in ks)
+    return list(tags)[:6]
 
 def pick_title(y: Dict[str,Any], a: Dict[str,Any]) -> str:
     # prioriza título mais específico (maior), mas sem estourar 80 chars
@@ -186,10 +280,9 @@ def pick_title(y: Dict[str,Any], a: Dict[str,Any]) -> str:
     cand = max(candidates, key=lambda s: (len(s), s))
     return cand[:80].strip() or (y.get("topic") or a.get("topic") or "Tópico")
 
-def summarize_pair(y: Dict[str,Any], a: Dict[str,Any]) -> Dict[str,Any]:
+def summarize_pair(y: Dict[str,Any], a: Dict[str,Any], score_c: float) -> Dict[str,Any]:
     title = pick_title(y,a)
     category = y.get("category") if y.get("category") == a.get("category") else (y.get("category") or a.get("category") or "general")
-    score_c = consensus_score(y,a)
     hashtags = union_keywords(y,a)
 
     # pega 1 evidência útil do YouTube (link do vídeo) e 2 do Alt (links de notícia)
@@ -200,24 +293,23 @@ def summarize_pair(y: Dict[str,Any], a: Dict[str,Any]) -> Dict[str,Any]:
         "topic": title,
         "category": category,
         "score_consensus": score_c,
-        "score_yt": float(safe_get(y, ["signals","_score"], 0.0) or 0.0),
-        "score_alt": float(safe_get(a, ["signals","_score"], 0.0) or 0.0),
+        "score_yt": _sig(y, "_score"),
+        "score_alt": _sig(a, "_score"),
         "yt_signals": {
-            "yt_view_velocity": float(safe_get(y, ["signals","yt_view_velocity"], 0.0) or 0.0),
-            "yt_recency": float(safe_get(y, ["signals","yt_recency"], 0.0) or 0.0),
+            "yt_view_velocity": _sig(y, "yt_view_velocity"),
+            "yt_recency": _sig(y, "yt_recency"),
         },
         "alt_signals": {
-            "src_count": float(safe_get(a, ["signals","src_count"], 0.0) or 0.0),
-            "news_count": float(safe_get(a, ["signals","news_count"], 0.0) or 0.0),
-            "popularity": float(safe_get(a, ["signals","popularity"], 0.0) or 0.0),
-            "recency": float(safe_get(a, ["signals","recency"], 0.0) or 0.0),
+            "src_count": _sig(a, "src_count"),
+            "news_count": _sig(a, "news_count"),
+            "popularity": _sig(a, "popularity"),
+            "recency": _sig(a, "recency"),
         },
         "hashtags": hashtags,
         "evidence": {
             "youtube": yt_ev,
             "alt": alt_evs
         },
-        "raw": {"youtube": y, "alt": a}
     }
 
 def main():
@@ -229,18 +321,24 @@ def main():
     ap.add_argument("--min-score-yt", type=float, default=0.0, help="filtra YouTube score < x (0..1)")
     ap.add_argument("--min-score-alt", type=float, default=0.0, help="filtra Alt score < x (0..1)")
     ap.add_argument("--save", type=str, default="output/consensus.json", help="onde salvar o JSON consolidado")
+    ap.add_argument("--keep-raw", action="store_true", help="inclui os itens originais (raw) nos pares do top-k")
     args = ap.parse_args()
 
-    yt = [it for it in load_json(args.yt) if float(it.get("score",0.0)) >= args.min_score_yt]
-    alt = [it for it in load_json(args.alt) if float(it.get("score",0.0)) >= args.min_score_alt]
+    yt = load_json(args.yt, min_score=args.min_score_yt)
+    alt = load_json(args.alt, min_score=args.min_score_alt)
 
     merged = merge(yt, alt, threshold=args.threshold)
 
     # monta pares consolidados
-    pairs = [summarize_pair(y,a) for (y,a,sim) in merged["pairs"]]
+    scores_c = consensus_scores(merged["pairs"])
+    pairs = [(summarize_pair(y, a, float(sc)), y, a) for (y, a, sim), sc in zip(merged["pairs"], scores_c)]
     # ordena por score de consenso
-    pairs.sort(key=lambda r: r["score_consensus"], reverse=True)
-    top_pairs = pairs[:args.topk]
+    pairs.sort(key=lambda t: t[0]["score_consensus"], reverse=True)
+    top_pairs = []
+    for r, y, a in pairs[:args.topk]:
+        if args.keep_raw:  # raw só nos k que saem (é o grosso do JSON)
+            r["raw"] = {"youtube": y, "alt": a}
+        top_pairs.append(r)
 
     # listas auxiliares
     only_yt_sorted = sorted(merged["only_yt"], key=lambda x: float(x.get("score",0.0)), reverse=True)[:args.topk]
@@ -269,8 +367,12 @@ def main():
         "only_youtube": only_yt_sorted,
         "only_alt": only_alt_sorted
     }
-    with open(args.save, "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        with open(args.save, "wb") as fb:
+            fb.write(orjson.dumps(out, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(out, f, ensure_ascii=False, indent=2)
     print(f"\n[OK] Salvo em: {args.save}")
 
 if __name__ == "__main__":
@@ -0,0 +1,23 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# os scripts são CLIs soltas (sem pacote): importa direto de scripts/
+SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+
+@pytest.fixture(scope="session")
+def script(tmp_path_factory):
+    """Importa um módulo de scripts/ com cwd temporário (alguns criam output/ no import)."""
+    def _load(name: str):
+        cwd = os.getcwd()
+        os.chdir(tmp_path_factory.mktemp(name))
+        try:
+            return importlib.import_module(name)
+        finally:
+            os.chdir(cwd)
+    return _load
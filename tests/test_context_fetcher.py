@@ -0,0 +1,60 @@
+import random
+import re
+
+import pytest
+
+# regex que _extract_name substituiu (referência de comportamento)
+_RE_NAME_OLD = re.compile(r"([A-ZÁÉÍÓÚÂÊÔÃÕ][\w:'\-]+(?:\s+[A-Za-z0-9:'\-]{2,}){1,5})")
+
+
+def _old_extract_name(line: str) -> str:
+    m = _RE_NAME_OLD.search(line)
+    return m.group(1).strip() if m else ""
+
+
+@pytest.fixture(scope="module")
+def cf(script):
+    return script("context_fetcher")
+
+
+@pytest.mark.parametrize("line", [
+    "",
+    "   ",
+    "Elden Ring por 99",
+    "hollow Knight Silksong",
+    "A b",
+    "Baldur's Gate 3 50%",
+    "Cyberpunk 2077 Phantom Liberty Ultimate Edition Extra Extra",
+    "Halo: Infinite",
+    "Jogo\tDo\nAno",
+    "Ação Total 2",
+    "abc Xy zz é",
+    "X1 é ok",
+    "Über Game x",
+])
+def test_extract_name_matches_old_regex(cf, line):
+    assert cf._extract_name(line) == _old_extract_name(line)
+
+
+def test_extract_name_matches_old_regex_random(cf):
+    rng = random.Random(1234)
+    alphabet = "AaBbZz09_:'-ÁÉÕéçÜ \t\n.,$%"
+    for _ in range(20000):
+        line = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert cf._extract_name(line) == _old_extract_name(line), repr(line)
+
+
+def test_find_main_container_ignores_previous_pages(cf):
+    from bs4 import BeautifulSoup
+
+    so_article = '<div class="content-area"><article><p>a</p></article></div>'
+    com_entry = ('<div class="content-area"><article><div class="entry-content"><p>b</p></div>'
+                 '<p>bio do autor</p></article></div>')
+
+    def achar(html):
+        return cf._find_main_container(BeautifulSoup(html, "html.parser"), cf.FLOW_SELECTORS)
+
+    antes = achar(com_entry)
+    achar(so_article)  # página que só casa com ".content-area article"
+    depois = achar(com_entry)
+    assert antes.get("class") == depois.get("class") == ["entry-content"]
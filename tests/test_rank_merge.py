@@ -0,0 +1,105 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("rapidfuzz")  # o fallback sem rapidfuzz só casa igualdade exata
+
+
+@pytest.fixture(scope="module")
+def rm(script):
+    return script("rank_merge")
+
+
+def _topics(items):
+    return [it["topic"] for it in items]
+
+
+def test_merge_pairs_and_leftovers(rm):
+    yt = [{"topic": "GTA 6 Trailer"}, {"topic": "Minecraft Update"}]
+    alt = [{"topic": "gta 6 trailers"}, {"topic": "Zelda"}]
+    out = rm.merge(yt, alt, threshold=84)
+    assert [(y["topic"], a["topic"]) for y, a, _ in out["pairs"]] == [("GTA 6 Trailer", "gta 6 trailers")]
+    assert out["pairs"][0][2] >= 84
+    assert _topics(out["only_yt"]) == ["Minecraft Update"]
+    assert _topics(out["only_alt"]) == ["Zelda"]
+
+
+def test_merge_uses_best_key_of_each_item(rm):
+    # o tópico não casa, mas um keyword do yt casa com um alias do alt
+    yt = [{"topic": "lançamento da semana", "keywords": ["hollow knight silksong"]}]
+    alt = [{"topic": "metroidvania", "aliases": ["Hollow Knight: Silksong"]}]
+    out = rm.merge(yt, alt, threshold=84)
+    assert len(out["pairs"]) == 1
+    assert out["only_yt"] == [] and out["only_alt"] == []
+
+
+def test_merge_is_global_greedy(rm):
+    # os dois yt preferem alt[0]; o de score maior fica com ele e o outro cai no 2º melhor
+    yt = [{"topic": "gta 6 trailer leaks"}, {"topic": "gta 6 trailer leak"}]
+    alt = [{"topic": "gta 6 trailer leak"}, {"topic": "gta 6 trailer leaked"}]
+    out = rm.merge(yt, alt, threshold=84)
+    assert [(y["topic"], a["topic"]) for y, a, _ in out["pairs"]] == [
+        ("gta 6 trailer leaks", "gta 6 trailer leaked"),
+        ("gta 6 trailer leak", "gta 6 trailer leak"),
+    ]
+    assert out["only_yt"] == [] and out["only_alt"] == []
+
+
+def test_merge_items_without_keys(rm):
+    yt = [{"topic": ""}, {"topic": "Zelda"}]
+    alt = [{"topic": "!!"}, {"topic": "zelda"}]
+    out = rm.merge(yt, alt, threshold=84)
+    assert [(y["topic"], a["topic"]) for y, a, _ in out["pairs"]] == [("Zelda", "zelda")]
+    assert _topics(out["only_yt"]) == [""]
+    assert _topics(out["only_alt"]) == ["!!"]
+
+
+def test_merge_empty_inputs(rm):
+    assert rm.merge([], [{"topic": "zelda"}], threshold=84) == {
+        "pairs": [], "only_yt": [], "only_alt": [{"topic": "zelda"}]}
+    assert rm.merge([{"topic": "zelda"}], [], threshold=84) == {
+        "pairs": [], "only_yt": [{"topic": "zelda"}], "only_alt": []}
+
+
+def test_merge_chunked_matches_single_block(rm, monkeypatch):
+    yt = [{"topic": "gta 6 trailer leaks", "keywords": ["rockstar", "gta vi"]},
+          {"topic": ""}, {"topic": "gta 6 trailer leak"}, {"topic": "Zelda", "aliases": ["tears of the kingdom"]}]
+    alt = [{"topic": "gta 6 trailer leak"}, {"topic": "zelda tears of the kingdom"},
+           {"topic": "gta 6 trailer leaked"}]
+    inteiro = rm.merge(yt, alt, threshold=84)
+    monkeypatch.setattr(rm, "MERGE_CHUNK_ROWS", 1)  # bloco de um item por chamada
+    em_blocos = rm.merge(yt, alt, threshold=84)
+    assert em_blocos == inteiro
+
+
+def _par(y_score, a_score, vel=0.0, pop=0.0, srcs=1.0):
+    y = {"signals": {"_score": y_score, "yt_view_velocity": vel}}
+    a = {"signals": {"_score": a_score, "popularity": pop, "src_count": srcs}}
+    return (y, a, 100.0)
+
+
+def test_consensus_scores_single_pair_has_zero_z(rm):
+    import numpy as np
+
+    sc = rm.consensus_scores([_par(0.5, 0.25, vel=80.0, pop=40.0, srcs=5.0)])
+    assert sc.shape == (1,)
+    assert sc[0] == pytest.approx(1.0 / (1.0 + np.exp(-(0.60 * 0.5 + 0.40 * 0.25))))
+
+
+def test_consensus_scores_constant_signals_have_zero_z(rm):
+    import numpy as np
+
+    pairs = [_par(0.2, 0.1, vel=50.0, pop=30.0, srcs=3.0), _par(0.8, 0.4, vel=50.0, pop=30.0, srcs=3.0)]
+    sc = rm.consensus_scores(pairs)
+    esperado = [1.0 / (1.0 + np.exp(-(0.60 * y + 0.40 * a))) for y, a in ((0.2, 0.1), (0.8, 0.4))]
+    assert sc == pytest.approx(esperado)
+
+
+def test_consensus_scores_rank_signals_across_pairs(rm):
+    import numpy as np
+
+    # mesmos _score; só a velocidade muda. O z-score intra-par antigo (zscore([x, 0]))
+    # dava +1 para as duas e empatava; entre pares a de 90 fica acima da de 10
+    pairs = [_par(0.5, 0.5, vel=10.0), _par(0.5, 0.5, vel=90.0), _par(0.5, 0.5, vel=50.0)]
+    sc = rm.consensus_scores(pairs)
+    assert list(sc.argsort()[::-1]) == [1, 2, 0]
+    assert sc[2] == pytest.approx(1.0 / (1.0 + np.exp(-0.5)))  # velocidade na média → z = 0